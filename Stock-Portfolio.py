@@ -1,7 +1,37 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from datetime import datetime
+from tkinter import ttk, messagebox
+import heapq
 import os
+import queue
+import sqlite3
+import time
+from datetime import date
+
+from portfolio_core import MAX_QUANTITY, validate_holding
+from accounts import AccountBook, DEFAULT_ACCOUNT
+from demo_data import DEMO_COMPANY_NAMES, DEMO_CURRENCIES, DEMO_PRICES
+from portfolio_store import PortfolioStore
+from inr_format import format_inr
+from fx import DEFAULT_RATES, FxCache, NativePrices, format_money, format_money_total, fx_pair
+from reports import FORMATS, ReportData, render, stream_to_widget, write_report
+from timeseries import PriceHistory
+from analytics import PnLAnalytics
+from tree_views import CoalescedTreeView, VirtualTreeView
+from symbol_search import SymbolSearch
+from perf import TIMINGS, LagMonitor, format_stats, measure, timed
+
+PRICE_POLL_MS = 250
+IMPORT_POLL_MS = 100
+STORE_POLL_MS = 1000
+RISK_SCENARIOS = 200_000
+PORTFOLIO_DB = os.environ.get("PORTFOLIO_DB", "portfolio.db")
+PRICE_HISTORY_DIR = os.environ.get("PRICE_HISTORY_DIR", "price_history")
+VIRTUAL_LIST_THRESHOLD = 500  # stock lists longer than this are windowed
+SEARCH_LIMIT = 200  # stock list rows shown for a search
+SUGGESTION_LIMIT = 20  # dropdown entries shown for a search
+FX_MAX_AGE = 15 * 60  # seconds before a live FX quote falls back to the default
+PERF_REFRESH_MS = 500
+FIRM_SUMMARY_ROWS = 10  # accounts and holdings listed in the firm summary
 
 class StockPortfolioTracker:
     def __init__(self, root):
@@ -10,27 +40,69 @@ class StockPortfolioTracker:
         self.root.geometry("1000x700")
         self.root.configure(bg="#2c3e50")
         
-        # Hardcoded stock prices in Indian Rupees (₹)
-        self.stock_prices_inr = {
-            "AAPL": 15000.50,   # Apple Inc.
-            "TSLA": 20875.25,   # Tesla Inc.
-            "MSFT": 28350.80,   # Microsoft
-            "GOOGL": 12150.40,  # Alphabet (Google)
-            "AMZN": 14608.75,   # Amazon
-            "NVDA": 79217.50,   # NVIDIA
-            "META": 40437.50,   # Meta Platforms
-            "RELIANCE": 2850.60, # Reliance Industries
-            "TCS": 3850.75,     # Tata Consultancy Services
-            "INFY": 1650.25,    # Infosys
-            "HDFCBANK": 1750.40, # HDFC Bank
-            "WIPRO": 525.30,    # Wipro
-            "HINDUNILVR": 2450.80, # Hindustan Unilever
-            "ITC": 435.60,      # ITC Limited
-            "SBIN": 650.75      # State Bank of India
-        }
-        
-        self.portfolio = {}
+        # Demo prices in each stock's trading currency
+        self.stock_prices = dict(DEMO_PRICES)
+        self.stock_currencies = dict(DEMO_CURRENCIES)
+        
+        # The books are kept in rupees; stock_prices_inr is derived from the
+        # native prices and updated in place as quotes and FX rates move
+        self.fx = FxCache(max_age=FX_MAX_AGE, defaults=DEFAULT_RATES)
+        self.pricing = NativePrices(self.stock_prices, self.stock_currencies, self.fx)
+        self.stock_prices_inr = self.pricing.base_prices
+        
+        self.company_names = dict(DEMO_COMPANY_NAMES)
+        
+        self.stock_symbols = list(self.stock_prices)
+        # Rows currently shown in the stock list; narrowed while searching
+        self.visible_symbols = self.stock_symbols
+        self.symbol_filter = None
+        self.symbol_search = SymbolSearch({s: self.company_names.get(s, "") for s in self.stock_symbols})
+        # Named client accounts share one price table; self.portfolio is the active one
+        self.accounts = AccountBook(self.stock_prices_inr)
+        self.account = DEFAULT_ACCOUNT
+        self.portfolio = self.accounts.open(DEFAULT_ACCOUNT)
+        # Saved bars are loaded in the second startup stage
+        self.price_history = PriceHistory()
+        self.analytics = PnLAnalytics(self.portfolio, self.price_history)
+        self.import_worker = None
+        self.import_account = None
+        self.risk_job = None
+        self.risk_account = None
+        self.price_feed = None
+        self.preview_window = None
+        self.stop_preview = None
+        self.store_error = None
         self.setup_ui()
+        self.restore_portfolio()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Performance overlay (F12), off unless PORTFOLIO_PERF is set
+        self.lag_monitor = LagMonitor(self.root)
+        self.perf_refresh = None
+        self.root.bind("<F12>", self.toggle_perf_overlay)
+        if os.environ.get("PORTFOLIO_PERF"):
+            self.toggle_perf_overlay()
+        # The holdings come up first; everything else waits for the first frame
+        self.root.after_idle(lambda: self.root.after(0, self.finish_startup))
+    
+    def finish_startup(self):
+        """Second startup stage: stock list, input form, price history and live prices"""
+        self.setup_secondary_ui()
+        self.price_history = PriceHistory.load(PRICE_HISTORY_DIR)
+        self.analytics.history = self.price_history
+        self.analytics.rebuild()
+        
+        # Live prices, enabled by pointing PRICE_FEED_URL at a quote server
+        feed_url = os.environ.get("PRICE_FEED_URL")
+        if feed_url:
+            # Deferred: the feed pulls in asyncio, which most sessions never need
+            from price_feed import HttpPriceSource, PriceFeed
+            symbols = self.stock_symbols + [fx_pair(c) for c in DEFAULT_RATES]
+            self.price_feed = PriceFeed(HttpPriceSource(feed_url), symbols)
+            self.price_feed.start()
+            self.root.after(PRICE_POLL_MS, self.poll_price_feed)
+        # Build the search index once the window is up
+        self.root.after_idle(self.symbol_search.start)
         
     def setup_ui(self):
         # Title Frame
@@ -48,84 +120,41 @@ class StockPortfolioTracker:
         title_label.pack(expand=True)
         
         # Main Container
-        main_container = tk.Frame(self.root, bg="#2c3e50")
-        main_container.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        # Left Frame - Input Section
-        left_frame = tk.Frame(main_container, bg="#34495e", relief=tk.RAISED, bd=2)
-        left_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
-        
-        # Available Stocks Section
-        stocks_frame = tk.LabelFrame(left_frame, text="📊 Available Stocks", 
-                                    font=("Arial", 12, "bold"),
-                                    bg="#34495e", fg="#ecf0f1", relief=tk.GROOVE)
-        stocks_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.main_container = tk.Frame(self.root, bg="#2c3e50")
+        self.main_container.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Treeview for stocks
-        columns = ("Stock", "Price (₹)")
-        self.stock_tree = ttk.Treeview(stocks_frame, columns=columns, show="headings", height=10)
-        
-        # Configure columns
-        self.stock_tree.heading("Stock", text="Stock Symbol")
-        self.stock_tree.heading("Price (₹)", text="Current Price (₹)")
-        self.stock_tree.column("Stock", width=150)
-        self.stock_tree.column("Price (₹)", width=150)
-        
-        # Add scrollbar
-        stock_scroll = ttk.Scrollbar(stocks_frame, orient="vertical", command=self.stock_tree.yview)
-        self.stock_tree.configure(yscrollcommand=stock_scroll.set)
-        
-        self.stock_tree.pack(side="left", fill="both", expand=True, padx=(10, 0))
-        stock_scroll.pack(side="right", fill="y", padx=(0, 10))
-        
-        # Populate stock list
-        self.populate_stock_list()
-        
-        # Portfolio Input Section
-        input_frame = tk.LabelFrame(left_frame, text="➕ Add to Portfolio", 
-                                   font=("Arial", 12, "bold"),
-                                   bg="#34495e", fg="#ecf0f1", relief=tk.GROOVE)
-        input_frame.pack(fill="x", padx=10, pady=10)
-        
-        # Stock selection
-        tk.Label(input_frame, text="Stock Symbol:", 
-                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        
-        self.stock_var = tk.StringVar()
-        stock_combo = ttk.Combobox(input_frame, textvariable=self.stock_var, 
-                                  values=list(self.stock_prices_inr.keys()),
-                                  state="readonly", width=20)
-        stock_combo.grid(row=0, column=1, padx=5, pady=5)
-        stock_combo.set("Select Stock")
-        
-        # Quantity input
-        tk.Label(input_frame, text="Quantity:", 
-                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        
-        self.quantity_var = tk.StringVar()
-        quantity_entry = tk.Entry(input_frame, textvariable=self.quantity_var, 
-                                 font=("Arial", 10), width=23)
-        quantity_entry.grid(row=1, column=1, padx=5, pady=5)
-        
-        # Add button
-        add_button = tk.Button(input_frame, text="Add Stock", 
-                              command=self.add_to_portfolio,
-                              bg="#27ae60", fg="white",
-                              font=("Arial", 10, "bold"),
-                              relief=tk.RAISED, cursor="hand2")
-        add_button.grid(row=2, column=0, columnspan=2, pady=10, padx=5, sticky="ew")
+        # Right Frame - Portfolio Display
+        self.right_frame = right_frame = tk.Frame(self.main_container, bg="#34495e",
+                                                  relief=tk.RAISED, bd=2)
+        right_frame.pack(side="right", fill="both", expand=True)
         
-        # Clear button
-        clear_button = tk.Button(input_frame, text="Clear Portfolio", 
-                                command=self.clear_portfolio,
-                                bg="#e74c3c", fg="white",
+        # Account selection
+        account_frame = tk.Frame(right_frame, bg="#34495e")
+        account_frame.pack(fill="x", padx=10, pady=(10, 0))
+        
+        tk.Label(account_frame, text="Account:",
+                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).pack(side="left", padx=5)
+        
+        self.account_var = tk.StringVar(value=self.account)
+        self.account_combo = ttk.Combobox(account_frame, textvariable=self.account_var,
+                                          values=self.accounts.names(),
+                                          state="readonly", width=20)
+        self.account_combo.pack(side="left", padx=5)
+        self.account_combo.bind("<<ComboboxSelected>>", self.switch_account)
+        
+        new_account_button = tk.Button(account_frame, text="New Account",
+                                       command=self.new_account,
+                                       bg="#2980b9", fg="white",
+                                       font=("Arial", 10, "bold"),
+                                       relief=tk.RAISED, cursor="hand2")
+        new_account_button.pack(side="left", padx=5)
+        
+        firm_button = tk.Button(account_frame, text="Firm Summary",
+                                command=self.show_firm_summary,
+                                bg="#2980b9", fg="white",
                                 font=("Arial", 10, "bold"),
                                 relief=tk.RAISED, cursor="hand2")
-        clear_button.grid(row=3, column=0, columnspan=2, pady=(0, 10), padx=5, sticky="ew")
-        
-        # Right Frame - Portfolio Display
-        right_frame = tk.Frame(main_container, bg="#34495e", relief=tk.RAISED, bd=2)
-        right_frame.pack(side="right", fill="both", expand=True)
+        firm_button.pack(side="left", padx=5)
         
         # Portfolio Treeview
         portfolio_frame = tk.LabelFrame(right_frame, text="📋 Your Portfolio", 
@@ -133,7 +162,7 @@ class StockPortfolioTracker:
                                        bg="#34495e", fg="#ecf0f1", relief=tk.GROOVE)
         portfolio_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        columns = ("Stock", "Quantity", "Price (₹)", "Value (₹)")
+        columns = ("Stock", "Quantity", "Price (₹)", "Value (₹)", "P&L (₹)")
         self.portfolio_tree = ttk.Treeview(portfolio_frame, columns=columns, show="headings", height=12)
         
         # Configure columns
@@ -141,11 +170,13 @@ class StockPortfolioTracker:
         self.portfolio_tree.heading("Quantity", text="Quantity")
         self.portfolio_tree.heading("Price (₹)", text="Price per Share (₹)")
         self.portfolio_tree.heading("Value (₹)", text="Total Value (₹)")
+        self.portfolio_tree.heading("P&L (₹)", text="Unrealized P&L (₹)")
         
         self.portfolio_tree.column("Stock", width=100)
         self.portfolio_tree.column("Quantity", width=80)
         self.portfolio_tree.column("Price (₹)", width=120)
         self.portfolio_tree.column("Value (₹)", width=120)
+        self.portfolio_tree.column("P&L (₹)", width=110)
         
         # Add scrollbar
         portfolio_scroll = ttk.Scrollbar(portfolio_frame, orient="vertical", command=self.portfolio_tree.yview)
@@ -153,6 +184,9 @@ class StockPortfolioTracker:
         
         self.portfolio_tree.pack(side="left", fill="both", expand=True, padx=(10, 0))
         portfolio_scroll.pack(side="right", fill="y", padx=(0, 10))
+        # Holdings can grow without bound (bulk imports), so always window them
+        self.portfolio_view = VirtualTreeView(self.portfolio_tree, portfolio_scroll,
+                                              lambda: self.portfolio.symbols, self.portfolio_row)
         
         # Total Value Display
         total_frame = tk.Frame(right_frame, bg="#34495e")
@@ -162,7 +196,19 @@ class StockPortfolioTracker:
                                    text="Total Portfolio Value: ₹0.00",
                                    font=("Arial", 14, "bold"),
                                    bg="#34495e", fg="#f1c40f")
-        self.total_label.pack(pady=10)
+        self.total_label.pack(pady=(10, 0))
+        
+        self.pnl_label = tk.Label(total_frame,
+                                 text="Unrealized P&L: ₹0.00",
+                                 font=("Arial", 11),
+                                 bg="#34495e", fg="#ecf0f1")
+        self.pnl_label.pack()
+        
+        self.firm_label = tk.Label(total_frame,
+                                  text="Firm Total: ₹0.00",
+                                  font=("Arial", 10),
+                                  bg="#34495e", fg="#bdc3c7")
+        self.firm_label.pack(pady=(0, 10))
         
         # Buttons Frame
         button_frame = tk.Frame(right_frame, bg="#34495e")
@@ -177,8 +223,8 @@ class StockPortfolioTracker:
                                width=15)
         calc_button.pack(side="left", padx=5)
         
-        # Save Button
-        save_button = tk.Button(button_frame, text="Save to TXT File",
+        # Save Button and report format
+        save_button = tk.Button(button_frame, text="Save Report",
                                command=self.save_to_file,
                                bg="#9b59b6", fg="white",
                                font=("Arial", 11, "bold"),
@@ -186,6 +232,13 @@ class StockPortfolioTracker:
                                width=15)
         save_button.pack(side="left", padx=5)
         
+        self.report_format_var = tk.StringVar(value="TXT")
+        self.currency_var = tk.StringVar(value=self.fx.base)
+        format_combo = ttk.Combobox(button_frame, textvariable=self.report_format_var,
+                                    values=[fmt.upper() for fmt in FORMATS],
+                                    state="readonly", width=5)
+        format_combo.pack(side="left", padx=(0, 5))
+        
         # Preview Button
         preview_button = tk.Button(button_frame, text="Preview Report",
                                   command=self.preview_report,
@@ -201,58 +254,342 @@ class StockPortfolioTracker:
                                   font=("Arial", 10), anchor="w",
                                   relief=tk.SUNKEN)
         self.status_bar.pack(side="bottom", fill="x")
+        
+        # Timing overlay, packed above the status bar while enabled
+        self.perf_label = tk.Label(self.root, text="",
+                                  bg="#1c2833", fg="#2ecc71",
+                                  font=("Courier New", 9), anchor="w")
+    
+    def setup_secondary_ui(self):
+        """Panels built after the first frame: stock list, input form and analysis"""
+        # Left Frame - Input Section
+        left_frame = tk.Frame(self.main_container, bg="#34495e", relief=tk.RAISED, bd=2)
+        left_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        
+        # Available Stocks Section
+        stocks_frame = tk.LabelFrame(left_frame, text="📊 Available Stocks", 
+                                    font=("Arial", 12, "bold"),
+                                    bg="#34495e", fg="#ecf0f1", relief=tk.GROOVE)
+        stocks_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Treeview for stocks
+        columns = ("Stock", "Company", "Price (₹)")
+        self.stock_tree = ttk.Treeview(stocks_frame, columns=columns, show="headings", height=10)
+        
+        # Configure columns
+        self.stock_tree.heading("Stock", text="Stock Symbol")
+        self.stock_tree.heading("Company", text="Company")
+        self.stock_tree.heading("Price (₹)", text="Current Price")
+        self.stock_tree.column("Stock", width=100)
+        self.stock_tree.column("Company", width=170)
+        self.stock_tree.column("Price (₹)", width=120)
+        
+        # Add scrollbar
+        stock_scroll = ttk.Scrollbar(stocks_frame, orient="vertical", command=self.stock_tree.yview)
+        self.stock_tree.configure(yscrollcommand=stock_scroll.set)
+        
+        self.stock_tree.pack(side="left", fill="both", expand=True, padx=(10, 0))
+        stock_scroll.pack(side="right", fill="y", padx=(0, 10))
+        if len(self.stock_symbols) > VIRTUAL_LIST_THRESHOLD:
+            self.stock_view = VirtualTreeView(self.stock_tree, stock_scroll,
+                                              lambda: self.visible_symbols, self.stock_row)
+        else:
+            self.stock_view = CoalescedTreeView(self.stock_tree, self.stock_row)
+        
+        # Populate stock list
+        self.populate_stock_list()
+        
+        # Portfolio Input Section
+        input_frame = tk.LabelFrame(left_frame, text="➕ Add to Portfolio", 
+                                   font=("Arial", 12, "bold"),
+                                   bg="#34495e", fg="#ecf0f1", relief=tk.GROOVE)
+        input_frame.pack(fill="x", padx=10, pady=10)
+        
+        # Stock selection; typing searches symbols and company names
+        tk.Label(input_frame, text="Stock Symbol:", 
+                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        
+        self.stock_var = tk.StringVar()
+        self.stock_combo = ttk.Combobox(input_frame, textvariable=self.stock_var, 
+                                        values=self.stock_symbols[:SUGGESTION_LIMIT], width=20)
+        self.stock_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.stock_combo.set("Select Stock")
+        self.stock_combo.bind("<KeyRelease>", self.search_stocks)
+        self.stock_combo.bind("<FocusIn>", self.clear_stock_placeholder)
+        self.stock_combo.bind("<<ComboboxSelected>>", lambda e: self.filter_stock_list(None))
+        
+        # Quantity input
+        tk.Label(input_frame, text="Quantity:", 
+                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        
+        self.quantity_var = tk.StringVar()
+        quantity_entry = tk.Entry(input_frame, textvariable=self.quantity_var, 
+                                 font=("Arial", 10), width=23)
+        quantity_entry.grid(row=1, column=1, padx=5, pady=5)
+        
+        # Add button
+        add_button = tk.Button(input_frame, text="Add Stock", 
+                              command=self.add_to_portfolio,
+                              bg="#27ae60", fg="white",
+                              font=("Arial", 10, "bold"),
+                              relief=tk.RAISED, cursor="hand2")
+        add_button.grid(row=2, column=0, columnspan=2, pady=10, padx=5, sticky="ew")
+        
+        # Clear button
+        clear_button = tk.Button(input_frame, text="Clear Portfolio", 
+                                command=self.clear_portfolio,
+                                bg="#e74c3c", fg="white",
+                                font=("Arial", 10, "bold"),
+                                relief=tk.RAISED, cursor="hand2")
+        clear_button.grid(row=3, column=0, columnspan=2, pady=(0, 10), padx=5, sticky="ew")
+        
+        # Bulk import button and progress
+        self.import_button = tk.Button(input_frame, text="Import Holdings (CSV/JSON)",
+                                       command=self.import_holdings,
+                                       bg="#16a085", fg="white",
+                                       font=("Arial", 10, "bold"),
+                                       relief=tk.RAISED, cursor="hand2")
+        self.import_button.grid(row=4, column=0, columnspan=2, pady=(0, 10), padx=5, sticky="ew")
+        
+        self.import_progress = ttk.Progressbar(input_frame, mode="determinate", maximum=1.0)
+        
+        # Analysis Buttons
+        analysis_frame = tk.Frame(self.right_frame, bg="#34495e")
+        analysis_frame.pack(fill="x", padx=10, pady=(0, 10))
+        
+        self.risk_button = tk.Button(analysis_frame, text="Risk (VaR / CVaR)",
+                                     command=self.run_risk,
+                                     bg="#c0392b", fg="white",
+                                     font=("Arial", 11, "bold"),
+                                     relief=tk.RAISED, cursor="hand2",
+                                     width=15)
+        self.risk_button.pack(side="left", padx=5)
+        
+        # Reporting currency for totals and reports
+        tk.Label(analysis_frame, text="Reporting currency:",
+                bg="#34495e", fg="#ecf0f1", font=("Arial", 10)).pack(side="left", padx=(15, 5))
+        
+        currency_combo = ttk.Combobox(analysis_frame, textvariable=self.currency_var,
+                                      values=self.fx.currencies(),
+                                      state="readonly", width=5)
+        currency_combo.pack(side="left")
+        currency_combo.bind("<<ComboboxSelected>>", lambda e: self.calculate_total())
+    
+    def restore_portfolio(self):
+        """Reload holdings saved by previous sessions"""
+        self.store = PortfolioStore(PORTFOLIO_DB)
+        try:
+            books = self.store.load()
+        except sqlite3.Error as e:
+            self.store = None
+            messagebox.showwarning("Warning", f"Could not open saved portfolio: {e}")
+            return
+        self.store.start()
+        self.root.after(STORE_POLL_MS, self.poll_store)
+        
+        restored = 0
+        for name, holdings in books.items():
+            self.accounts.open(name)
+            known = {s: h for s, h in holdings.items()
+                     if s in self.stock_prices_inr and 0 < h[0] <= MAX_QUANTITY}
+            if not known:
+                continue
+            symbols = list(known)
+            quantities = [known[s][0] for s in symbols]
+            # Lots saved before purchase prices were journaled fall back to today's price
+            costs = [cost if cost is not None else qty * self.stock_prices_inr[s]
+                     for s, (qty, cost, _) in known.items()]
+            purchased = [date.fromisoformat(p) if p else date.today()
+                         for _, _, p in known.values()]
+            self.accounts.add_many(name, symbols, quantities, costs, purchased)
+            restored += len(known)
+        self.account_combo.config(values=self.accounts.names())
+        if restored:
+            self.portfolio_view.mark_dirty(self.portfolio.symbols)
+            self.analytics.rebuild()
+            self.update_status(f"Restored {restored} holdings in {len(self.accounts)} "
+                               f"accounts from {PORTFOLIO_DB}")
+    
+    def poll_store(self):
+        """Show write failures reported by the store's writer thread"""
+        if not self.store:
+            return
+        error = self.store.last_error
+        if error is not None and error is not self.store_error:
+            self.update_status(f"Could not save to {PORTFOLIO_DB}: {error}")
+        self.store_error = error
+        self.root.after(STORE_POLL_MS, self.poll_store)
     
     def populate_stock_list(self):
         """Populate the stock list in the treeview"""
-        for stock, price in self.stock_prices_inr.items():
-            self.stock_tree.insert("", "end", values=(stock, f"₹{price:,.2f}"))
+        self.stock_view.mark_dirty(self.stock_symbols)
     
-    def add_to_portfolio(self):
-        """Add selected stock to portfolio"""
-        stock = self.stock_var.get()
-        quantity_str = self.quantity_var.get()
-        
-        if stock == "Select Stock" or not stock:
-            messagebox.showwarning("Warning", "Please select a stock symbol!")
+    def stock_row(self, stock):
+        """Return the stock list row for a symbol, or None if filtered out"""
+        price = self.pricing.native.get(stock)
+        if price is None or (self.symbol_filter is not None and stock not in self.symbol_filter):
+            return None
+        return (stock, self.company_names.get(stock, ""),
+                format_money(price, self.pricing.currency(stock)))
+    
+    def clear_stock_placeholder(self, event=None):
+        if self.stock_var.get() == "Select Stock":
+            self.stock_var.set("")
+    
+    def search_stocks(self, event=None):
+        """Narrow the dropdown and stock list to symbols matching what was typed"""
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
             return
-        
-        if not quantity_str.isdigit():
-            messagebox.showwarning("Warning", "Please enter a valid quantity (whole number)!")
+        query = self.stock_var.get().strip()
+        if not query:
+            self.stock_combo.config(values=self.stock_symbols[:SUGGESTION_LIMIT])
+            self.filter_stock_list(None)
             return
-        
-        quantity = int(quantity_str)
-        if quantity <= 0:
-            messagebox.showwarning("Warning", "Quantity must be greater than 0!")
+        matches = self.symbol_search.search(query, SEARCH_LIMIT)
+        self.stock_combo.config(values=matches[:SUGGESTION_LIMIT])
+        self.filter_stock_list(matches)
+    
+    def filter_stock_list(self, matches):
+        """Show only matches (best first) in the stock list, or everything for None"""
+        if matches is None and self.symbol_filter is None:
+            return
+        self.visible_symbols = self.stock_symbols if matches is None else matches
+        self.symbol_filter = None if matches is None else set(matches)
+        self.stock_view.reset()
+        self.stock_view.mark_dirty(self.visible_symbols)
+    
+    def portfolio_row(self, stock):
+        """Return the portfolio row for a symbol, or None if not held"""
+        if stock not in self.portfolio:
+            return None
+        value = self.portfolio.position_value(stock)
+        return (stock, self.portfolio.quantity(stock),
+                format_inr(self.portfolio.price(stock)),
+                format_inr(value),
+                format_inr(value - self.portfolio.cost_basis(stock)))
+    
+    def poll_price_feed(self):
+        """Apply queued price updates from the feed thread to the UI"""
+        with measure("price refresh"):
+            self.apply_price_updates()
+        self.root.after(PRICE_POLL_MS, self.poll_price_feed)
+    
+    def apply_price_updates(self):
+        """Revalue holdings from the quotes and FX rates queued by the feed"""
+        prices, error = self.price_feed.drain()
+        now = time.time()
+        # An FX move (or an expired FX quote) re-prices that currency's whole bucket;
+        # stock quotes arrive in their own currency
+        rates = {c: prices.pop(fx_pair(c)) for c in DEFAULT_RATES if fx_pair(c) in prices}
+        book_prices = {}
+        for currency in self.fx.update(rates, now) + self.fx.evict_stale(now):
+            book_prices.update(self.pricing.rebase(currency))
+        book_prices.update(self.pricing.update_quotes(prices))
+        if book_prices:
+            # Only accounts holding a changed symbol are revalued
+            changed = self.accounts.update_prices(book_prices)
+            self.portfolio_view.mark_dirty(changed.get(self.account, ()))
+            self.stock_view.mark_dirty(prices)
+            self.analytics.on_prices(book_prices, now)
+        elif error:
+            self.update_status(f"Price feed error: {error}")
+    
+    def add_to_portfolio(self):
+        """Add selected stock to portfolio"""
+        # Typed symbols may be in lower case
+        stock = self.stock_var.get().strip()
+        if stock.upper() in self.stock_prices_inr:
+            stock = stock.upper()
+        try:
+            stock, quantity = validate_holding(stock, self.quantity_var.get(),
+                                               self.stock_prices_inr)
+            with measure("add"):
+                self.accounts.add(self.account, stock, quantity)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
             return
         
-        # Check if stock already in portfolio
-        if stock in self.portfolio:
-            self.portfolio[stock] += quantity
-            # Update existing entry
-            for item in self.portfolio_tree.get_children():
-                values = self.portfolio_tree.item(item)["values"]
-                if values[0] == stock:
-                    price = self.stock_prices_inr[stock]
-                    new_quantity = self.portfolio[stock]
-                    new_value = price * new_quantity
-                    self.portfolio_tree.item(item, values=(
-                        stock, new_quantity, f"₹{price:,.2f}", f"₹{new_value:,.2f}"
-                    ))
-                    break
-        else:
-            # Add new entry
-            self.portfolio[stock] = quantity
-            price = self.stock_prices_inr[stock]
-            value = price * quantity
-            self.portfolio_tree.insert("", "end", values=(
-                stock, quantity, f"₹{price:,.2f}", f"₹{value:,.2f}"
-            ))
+        self.portfolio_view.mark_dirty([stock])
+        if self.store:
+            self.store.record_add(self.account, stock, quantity, self.portfolio.price(stock))
         
         # Clear inputs
         self.stock_var.set("Select Stock")
         self.quantity_var.set("")
+        self.stock_combo.config(values=self.stock_symbols[:SUGGESTION_LIMIT])
+        self.filter_stock_list(None)
+        
+        self.update_status(f"Added {quantity} shares of {stock} to {self.account}")
+    
+    def import_holdings(self):
+        """Bulk import holdings from a broker CSV/JSON export"""
+        if self.import_worker:
+            return
+        from tkinter import filedialog
+        from portfolio_import import ImportWorker
+        path = filedialog.askopenfilename(
+            title="Import Holdings",
+            filetypes=[("Broker exports", "*.csv *.json *.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
         
-        self.update_status(f"Added {quantity} shares of {stock}")
+        # Holdings land in the account that was active when the import started
+        self.import_account = self.account
+        self.import_worker = ImportWorker(path, self.stock_prices_inr)
+        self.import_worker.start()
+        self.import_button.config(state="disabled")
+        self.import_progress["value"] = 0
+        self.import_progress.grid(row=5, column=0, columnspan=2, pady=(0, 10), padx=5, sticky="ew")
+        self.update_status(f"Importing {os.path.basename(path)}...")
+        self.root.after(IMPORT_POLL_MS, self.poll_import)
+    
+    def poll_import(self):
+        """Show import progress and apply the result once the worker finishes"""
+        while True:
+            try:
+                message = self.import_worker.messages.get_nowait()
+            except queue.Empty:
+                self.root.after(IMPORT_POLL_MS, self.poll_import)
+                return
+            
+            if message[0] == "progress":
+                _, fraction, rows = message
+                self.import_progress["value"] = fraction
+                self.update_status(f"Importing... {rows:,} rows read")
+                continue
+            
+            self.import_worker = None
+            self.import_button.config(state="normal")
+            self.import_progress.grid_remove()
+            
+            if message[0] == "failed":
+                messagebox.showerror("Error", f"Failed to import file: {message[1]}")
+                return
+            
+            report = message[1]
+            if report.totals:
+                try:
+                    self.accounts.add_many(self.import_account, list(report.totals),
+                                           list(report.totals.values()))
+                except ValueError as e:
+                    messagebox.showerror("Error", f"Import not added: {e}")
+                    return
+                if self.import_account == self.account:
+                    self.portfolio_view.mark_dirty(report.totals)
+                if self.store:
+                    self.store.record_add_many(self.import_account, report.totals,
+                                               self.stock_prices_inr)
+            if report.failed:
+                self.update_status(f"Import into {self.import_account} failed: file unreadable")
+            else:
+                self.update_status(f"Imported {report.rows_imported:,} rows into {self.import_account} "
+                                   f"({report.error_count:,} rejected)")
+            if report.error_count:
+                messagebox.showwarning("Import Report", report.summary())
+            else:
+                messagebox.showinfo("Import Report", report.summary())
+            return
     
     def clear_portfolio(self):
         """Clear the entire portfolio"""
@@ -260,102 +597,122 @@ class StockPortfolioTracker:
             messagebox.showinfo("Info", "Portfolio is already empty!")
             return
         
-        if messagebox.askyesno("Confirm", "Are you sure you want to clear the entire portfolio?"):
-            self.portfolio.clear()
-            for item in self.portfolio_tree.get_children():
-                self.portfolio_tree.delete(item)
-            self.total_label.config(text="Total Portfolio Value: ₹0.00")
-            self.update_status("Portfolio cleared")
+        if messagebox.askyesno("Confirm", f"Are you sure you want to clear the {self.account} portfolio?"):
+            with measure("clear"):
+                self.accounts.clear(self.account)
+                self.portfolio_view.reset()
+                if self.store:
+                    self.store.record_clear(self.account)
+            currency = self.currency_var.get()
+            self.total_label.config(text=f"Total Portfolio Value: {format_money_total(0.0, currency)}")
+            self.pnl_label.config(text=f"Unrealized P&L: {format_money(0.0, currency)}")
+            self.show_firm_total()
+            self.update_status(f"Portfolio {self.account} cleared")
     
-    def calculate_total(self):
-        """Calculate total portfolio value"""
-        total_value = 0
+    def new_account(self):
+        """Create a named account and switch to it"""
+        from tkinter import simpledialog
+        name = simpledialog.askstring("New Account", "Account name:", parent=self.root)
+        name = (name or "").strip()
+        if not name:
+            return
+        if name in self.accounts:
+            messagebox.showwarning("Warning", f"Account {name} already exists!")
+            return
+        
+        self.accounts.open(name)
+        if self.store:
+            self.store.record_open(name)
+        self.account_combo.config(values=self.accounts.names())
+        self.account_var.set(name)
+        self.switch_account()
+    
+    def switch_account(self, event=None):
+        """Show the account picked in the account selector"""
+        name = self.account_var.get()
+        if name == self.account or name not in self.accounts:
+            return
         
-        for item in self.portfolio_tree.get_children():
-            values = self.portfolio_tree.item(item)["values"]
-            value_str = values[3].replace("₹", "").replace(",", "")
-            total_value += float(value_str)
+        self.account = name
+        self.portfolio = self.accounts.get(name)
+        self.analytics.portfolio = self.portfolio
+        self.analytics.rebuild()
+        self.portfolio_view.reset()
+        self.calculate_total()
+        self.update_status(f"Switched to account {name}")
+    
+    @timed("calculate")
+    def calculate_total(self):
+        """Calculate total portfolio value in the reporting currency"""
+        # Book totals are in rupees, so a reporting currency is one division
+        currency = self.currency_var.get()
+        rate = self.fx.rate(currency)
+        total_value = self.portfolio.total_value / rate
         
         # Format with lakhs/crores if needed
-        if total_value >= 10000000:  # 1 Crore
-            crores = total_value / 10000000
-            display_text = f"Total Portfolio Value: ₹{total_value:,.2f} (₹{crores:.2f} Crores)"
-        elif total_value >= 100000:  # 1 Lakh
-            lakhs = total_value / 100000
-            display_text = f"Total Portfolio Value: ₹{total_value:,.2f} (₹{lakhs:.2f} Lakhs)"
-        else:
-            display_text = f"Total Portfolio Value: ₹{total_value:,.2f}"
-        
-        self.total_label.config(text=display_text)
-        self.update_status(f"Calculated total: ₹{total_value:,.2f}")
+        self.total_label.config(text=f"Total Portfolio Value: {format_money_total(total_value, currency)}")
+        
+        summary = self.analytics.summary()
+        pnl_text = (f"Unrealized P&L: {format_money(summary['pnl'] / rate, currency)} "
+                    f"({summary['return']:+.2%})")
+        if summary["volatility"]:
+            pnl_text += (f"  |  Volatility: {summary['volatility']:.1%}"
+                         f"  |  Max drawdown: {summary['max_drawdown']:.1%}")
+        self.pnl_label.config(text=pnl_text)
+        self.show_firm_total()
+        
+        buckets = self.pricing.bucket_values(self.portfolio)
+        exposure = ", ".join(format_money(value, c) for c, value in buckets.items())
+        self.update_status(f"Calculated total: {format_money(total_value, currency)}"
+                           + (f" (held as {exposure})" if len(buckets) > 1 else ""))
+    
+    def show_firm_total(self):
+        """Show the firm-wide total in the reporting currency"""
+        currency = self.currency_var.get()
+        firm_total = self.accounts.firm_total / self.fx.rate(currency)
+        self.firm_label.config(text=f"Firm Total: {format_money_total(firm_total, currency)} "
+                                    f"across {len(self.accounts)} accounts")
+    
+    def show_firm_summary(self):
+        """Show the largest accounts and firm-wide holdings across every account"""
+        currency = self.currency_var.get()
+        rate = self.fx.rate(currency)
+        totals = self.accounts.account_totals()
+        lines = [f"Firm Total: {format_money_total(self.accounts.firm_total / rate, currency)} "
+                 f"across {len(totals)} accounts", "", "Largest accounts:"]
+        for name, value in heapq.nlargest(FIRM_SUMMARY_ROWS, totals.items(), key=lambda item: item[1]):
+            lines.append(f"  {name}: {format_money(value / rate, currency)}")
+        if len(totals) > FIRM_SUMMARY_ROWS:
+            lines.append(f"  ... and {len(totals) - FIRM_SUMMARY_ROWS:,} more")
+        
+        combined = self.accounts.aggregate()
+        if combined:
+            lines += ["", "Largest holdings firm-wide:"]
+            for stock, quantity, _, value in heapq.nlargest(FIRM_SUMMARY_ROWS, combined.positions(),
+                                                            key=lambda row: row[3]):
+                lines.append(f"  {stock}: {quantity:,} shares, {format_money(value / rate, currency)}")
+        messagebox.showinfo("Firm Summary", "\n".join(lines))
+    
+    def report_data(self):
+        """Capture the active portfolio for a report in the reporting currency"""
+        currency = self.currency_var.get()
+        return ReportData(self.portfolio, currency=currency, rate=self.fx.rate(currency))
     
     def save_to_file(self):
-        """Save portfolio to text file"""
+        """Save portfolio report to a file in the selected format"""
         if not self.portfolio:
             messagebox.showwarning("Warning", "Portfolio is empty! Add some stocks first.")
             return
         
-        # Calculate total if not already calculated
-        total_value = 0
-        portfolio_items = []
-        
-        for item in self.portfolio_tree.get_children():
-            values = self.portfolio_tree.item(item)["values"]
-            value_str = values[3].replace("₹", "").replace(",", "")
-            total_value += float(value_str)
-            portfolio_items.append(values)
-        
-        # Get current timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        date_str = datetime.now().strftime("%d-%m-%Y")
+        fmt = self.report_format_var.get().lower()
+        data = self.report_data()
         
         # Create filename with timestamp
-        filename = f"portfolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        filename = f"portfolio_{data.generated.strftime('%Y%m%d_%H%M%S')}.{fmt}"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
-                file.write("=" * 70 + "\n")
-                file.write(" " * 20 + "PORTFOLIO SUMMARY (INDIAN RUPEES)\n")
-                file.write("=" * 70 + "\n")
-                file.write(f"Generated on: {timestamp}\n")
-                file.write(f"Date: {date_str}\n\n")
-                
-                file.write("STOCK HOLDINGS:\n")
-                file.write("-" * 70 + "\n")
-                file.write(f"{'Stock':<12} {'Quantity':<12} {'Price (₹)':<15} {'Value (₹)':<20}\n")
-                file.write("-" * 70 + "\n")
-                
-                for item in portfolio_items:
-                    stock, qty, price, value = item
-                    file.write(f"{stock:<12} {qty:<12} {price:<15} {value:<20}\n")
-                
-                file.write("-" * 70 + "\n")
-                file.write(f"{'TOTAL PORTFOLIO VALUE:':<39} ₹{total_value:,.2f}\n")
-                
-                # Add Indian numbering system
-                if total_value >= 10000000:
-                    crores = total_value / 10000000
-                    file.write(f"{'IN WORDS:':<39} ₹{crores:.2f} Crores\n")
-                elif total_value >= 100000:
-                    lakhs = total_value / 100000
-                    file.write(f"{'IN WORDS:':<39} ₹{lakhs:.2f} Lakhs\n")
-                
-                file.write("=" * 70 + "\n\n")
-                
-                # Summary
-                file.write("SUMMARY:\n")
-                file.write("-" * 70 + "\n")
-                file.write(f"• Number of different stocks: {len(self.portfolio)}\n")
-                file.write(f"• Total shares held: {sum(self.portfolio.values())}\n")
-                
-                if portfolio_items:
-                    # Find largest holding
-                    largest_item = max(portfolio_items, key=lambda x: float(x[3].replace("₹", "").replace(",", "")))
-                    file.write(f"• Largest holding: {largest_item[0]} (Value: {largest_item[3]})\n")
-                
-                file.write("\n" + "=" * 70 + "\n")
-                file.write("Note: Prices are for demonstration purposes only\n")
-                file.write("=" * 70 + "\n")
+            with measure("save"), open(filename, 'w', encoding='utf-8') as file:
+                write_report(render(data, fmt), file.write)
             
             messagebox.showinfo("Success", f"Portfolio saved to:\n{os.path.abspath(filename)}")
             self.update_status(f"Portfolio saved to {filename}")
@@ -364,26 +721,40 @@ class StockPortfolioTracker:
             messagebox.showerror("Error", f"Failed to save file: {str(e)}")
     
     def preview_report(self):
-        """Show preview of the report in a new window"""
+        """Show a preview of the report, reusing the preview window"""
         if not self.portfolio:
             messagebox.showwarning("Warning", "Portfolio is empty! Add some stocks first.")
             return
         
-        # Calculate total
-        total_value = 0
-        portfolio_items = []
-        
-        for item in self.portfolio_tree.get_children():
-            values = self.portfolio_tree.item(item)["values"]
-            value_str = values[3].replace("₹", "").replace(",", "")
-            total_value += float(value_str)
-            portfolio_items.append(values)
-        
-        # Create preview window
+        started = time.perf_counter()
+        if self.preview_window is None:
+            self.build_preview_window()
+        if self.stop_preview:
+            self.stop_preview()
+        text_area = self.preview_text
+        text_area.configure(state="normal")
+        text_area.delete("1.0", tk.END)
+        self.preview_window.deiconify()
+        self.preview_window.lift()
+        
+        # Stream the report in, then make it read-only
+        def done():
+            self.stop_preview = None
+            text_area.configure(state="disabled")
+            if TIMINGS.enabled:
+                TIMINGS.record("preview", time.perf_counter() - started)
+        
+        self.stop_preview = stream_to_widget(text_area, render(self.report_data(), "txt"),
+                                             on_done=done)
+    
+    def build_preview_window(self):
+        """Create the preview window once; closing it only hides it"""
+        from tkinter import scrolledtext
         preview_window = tk.Toplevel(self.root)
         preview_window.title("Portfolio Report Preview")
         preview_window.geometry("800x600")
         preview_window.configure(bg="#2c3e50")
+        preview_window.protocol("WM_DELETE_WINDOW", self.hide_preview)
         
         # Title
         title_label = tk.Label(preview_window, 
@@ -396,58 +767,120 @@ class StockPortfolioTracker:
         text_frame = tk.Frame(preview_window, bg="#34495e")
         text_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        text_area = scrolledtext.ScrolledText(text_frame, 
-                                             font=("Courier New", 10),
-                                             bg="#1c2833", fg="#ecf0f1",
-                                             wrap=tk.WORD)
-        text_area.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Generate report text
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        date_str = datetime.now().strftime("%d-%m-%Y")
-        
-        report_text = "=" * 70 + "\n"
-        report_text += " " * 20 + "PORTFOLIO SUMMARY (INDIAN RUPEES)\n"
-        report_text += "=" * 70 + "\n"
-        report_text += f"Generated on: {timestamp}\n"
-        report_text += f"Date: {date_str}\n\n"
-        
-        report_text += "STOCK HOLDINGS:\n"
-        report_text += "-" * 70 + "\n"
-        report_text += f"{'Stock':<12} {'Quantity':<12} {'Price (₹)':<15} {'Value (₹)':<20}\n"
-        report_text += "-" * 70 + "\n"
-        
-        for item in portfolio_items:
-            stock, qty, price, value = item
-            report_text += f"{stock:<12} {qty:<12} {price:<15} {value:<20}\n"
-        
-        report_text += "-" * 70 + "\n"
-        report_text += f"{'TOTAL PORTFOLIO VALUE:':<39} ₹{total_value:,.2f}\n"
-        
-        # Add Indian numbering system
-        if total_value >= 10000000:
-            crores = total_value / 10000000
-            report_text += f"{'IN WORDS:':<39} ₹{crores:.2f} Crores\n"
-        elif total_value >= 100000:
-            lakhs = total_value / 100000
-            report_text += f"{'IN WORDS:':<39} ₹{lakhs:.2f} Lakhs\n"
-        
-        report_text += "=" * 70 + "\n"
-        
-        # Insert text
-        text_area.insert("1.0", report_text)
-        text_area.configure(state="disabled")  # Make read-only
+        self.preview_text = scrolledtext.ScrolledText(text_frame, 
+                                                      font=("Courier New", 10),
+                                                      bg="#1c2833", fg="#ecf0f1",
+                                                      wrap=tk.WORD)
+        self.preview_text.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Close button
         close_button = tk.Button(preview_window, text="Close Preview",
-                                command=preview_window.destroy,
+                                command=self.hide_preview,
                                 bg="#e74c3c", fg="white",
                                 font=("Arial", 10, "bold"))
         close_button.pack(pady=10)
+        self.preview_window = preview_window
+    
+    def hide_preview(self):
+        """Stop any report still streaming in and hide the preview window"""
+        if self.stop_preview:
+            self.stop_preview()
+            self.stop_preview = None
+        self.preview_window.withdraw()
+    
+    def run_risk(self):
+        """Start a Monte Carlo VaR/CVaR run in the background"""
+        if not self.portfolio:
+            messagebox.showwarning("Warning", "Portfolio is empty! Add some stocks first.")
+            return
+        if self.risk_job:
+            return
+        
+        from risk import RiskJob
+        # The result describes the book as it was when the run started
+        self.risk_account = self.account
+        self.risk_job = RiskJob(self.portfolio, self.price_history, scenarios=RISK_SCENARIOS)
+        self.risk_job.start()
+        self.risk_button.config(state="disabled")
+        self.update_status(f"Simulating {RISK_SCENARIOS:,} risk scenarios...")
+        self.root.after(IMPORT_POLL_MS, self.poll_risk)
+    
+    def poll_risk(self):
+        """Show risk simulation progress and the result when it finishes"""
+        while True:
+            try:
+                message = self.risk_job.messages.get_nowait()
+            except queue.Empty:
+                self.root.after(IMPORT_POLL_MS, self.poll_risk)
+                return
+            
+            if message[0] == "progress":
+                _, done, total = message
+                self.update_status(f"Simulating risk scenarios... {done / total:.0%}")
+                continue
+            
+            job = self.risk_job
+            self.risk_job = None
+            self.risk_button.config(state="normal")
+            
+            if message[0] == "failed":
+                messagebox.showerror("Error", f"Risk simulation failed: {message[1]}")
+                return
+            
+            result = message[1]
+            currency = self.currency_var.get()
+            rate = self.fx.rate(currency)
+            lines = [f"1-day risk for {self.risk_account}, valued at "
+                     f"{format_money(job.total_value / rate, currency)} "
+                     f"({result['scenarios']:,} scenarios):", ""]
+            for level, (var, cvar) in result["levels"].items():
+                lines.append(f"VaR {level:.0%}:  {format_money(var / rate, currency)}")
+                lines.append(f"CVaR {level:.0%}: {format_money(cvar / rate, currency)}")
+            self.update_status(f"Risk simulation finished in {result['seconds']:.1f}s "
+                               f"on {result['workers']} workers")
+            messagebox.showinfo("Risk Report", "\n".join(lines))
+            return
     
     def update_status(self, message):
         """Update status bar message"""
         self.status_bar.config(text=f"Status: {message}")
+    
+    def toggle_perf_overlay(self, event=None):
+        """Show or hide action latencies and event-loop lag (F12)"""
+        TIMINGS.enabled = not TIMINGS.enabled
+        if TIMINGS.enabled:
+            TIMINGS.clear()
+            self.lag_monitor.start()
+            self.perf_label.pack(side="bottom", fill="x")
+            self.refresh_perf_overlay()
+        else:
+            self.lag_monitor.stop()
+            if self.perf_refresh:
+                self.root.after_cancel(self.perf_refresh)
+                self.perf_refresh = None
+            self.perf_label.pack_forget()
+    
+    def refresh_perf_overlay(self):
+        self.perf_label.config(text=format_stats(TIMINGS.stats()))
+        self.perf_refresh = self.root.after(PERF_REFRESH_MS, self.refresh_perf_overlay)
+    
+    def on_close(self):
+        """Stop background work and close the window"""
+        if self.price_feed:
+            self.price_feed.stop()
+        if self.import_worker:
+            self.import_worker.cancel()
+        if self.store:
+            self.store.close()
+            if self.store.last_error is not None:
+                messagebox.showerror("Error", f"Some changes could not be saved to "
+                                              f"{PORTFOLIO_DB}: {self.store.last_error}")
+            self.store = None
+        try:
+            self.price_history.save(PRICE_HISTORY_DIR)
+        except OSError:
+            pass
+        self.root.destroy()
 
 def main():
     root = tk.Tk()
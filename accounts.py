@@ -0,0 +1,105 @@
+"""Many named portfolios (client accounts) sharing one price table
+
+A reverse index maps each symbol to the accounts holding it, so a price
+change revalues only those accounts. Firm-wide totals are maintained
+incrementally from the deltas of each change.
+"""
+
+from portfolio_core import Portfolio
+
+DEFAULT_ACCOUNT = "Default"
+
+
+class AccountBook:
+    """Named Portfolio objects over a shared price table"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.accounts = {}
+        self.holders = {}
+        self.firm_total = 0.0
+        self.firm_cost = 0.0
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __contains__(self, name):
+        return name in self.accounts
+
+    def names(self):
+        return list(self.accounts)
+
+    def open(self, name):
+        """Return the account's portfolio, creating an empty one if needed"""
+        portfolio = self.accounts.get(name)
+        if portfolio is None:
+            portfolio = self.accounts[name] = Portfolio(self.prices)
+        return portfolio
+
+    def get(self, name):
+        return self.accounts[name]
+
+    def _track(self, name, portfolio, symbols, before_value, before_cost):
+        for symbol in symbols:
+            self.holders.setdefault(symbol, set()).add(name)
+        self.firm_total += portfolio.total_value - before_value
+        self.firm_cost += portfolio.total_cost - before_cost
+
+    def add(self, name, symbol, quantity, cost=None, purchased=None):
+        """Add shares to one account and return its new quantity"""
+        portfolio = self.open(name)
+        before_value, before_cost = portfolio.total_value, portfolio.total_cost
+        new_quantity = portfolio.add(symbol, quantity, cost, purchased)
+        self._track(name, portfolio, [symbol], before_value, before_cost)
+        return new_quantity
+
+    def add_many(self, name, symbols, quantities, costs=None, purchased=None):
+        portfolio = self.open(name)
+        before_value, before_cost = portfolio.total_value, portfolio.total_cost
+        portfolio.add_many(symbols, quantities, costs, purchased)
+        self._track(name, portfolio, set(symbols), before_value, before_cost)
+
+    def clear(self, name):
+        """Empty one account"""
+        portfolio = self.accounts.get(name)
+        if portfolio is None:
+            return
+        for symbol in portfolio.symbols:
+            holders = self.holders.get(symbol)
+            if holders:
+                holders.discard(name)
+                if not holders:
+                    del self.holders[symbol]
+        self.firm_total -= portfolio.total_value
+        self.firm_cost -= portfolio.total_cost
+        portfolio.clear()
+
+    def update_prices(self, updates):
+        """Apply {symbol: price} updates; return {account: changed symbols}
+
+        Only accounts found through the reverse index are revalued.
+        """
+        self.prices.update(updates)
+        per_account = {}
+        for symbol, price in updates.items():
+            for name in self.holders.get(symbol, ()):
+                per_account.setdefault(name, {})[symbol] = price
+        changed = {}
+        for name, subset in per_account.items():
+            portfolio = self.accounts[name]
+            before = portfolio.total_value
+            changed[name] = portfolio.update_prices(subset)
+            self.firm_total += portfolio.total_value - before
+        return changed
+
+    def account_totals(self):
+        """Return {account: total value}"""
+        return {name: p.total_value for name, p in self.accounts.items()}
+
+    def aggregate(self):
+        """Return a firm-wide Portfolio combining every account"""
+        combined = Portfolio(self.prices)
+        for portfolio in self.accounts.values():
+            if portfolio:
+                combined.add_many(portfolio.symbols, portfolio.quantities, portfolio.costs)
+        return combined
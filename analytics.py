@@ -0,0 +1,144 @@
+"""P&L and risk analytics over a Portfolio and its PriceHistory
+
+P&L comes from the portfolio's running totals. Portfolio level return
+statistics are kept incrementally: each completed bar feeds
+one return into running mean/variance (Welford) and running peak /
+drawdown state, so a new bar costs O(changed symbols), not a rescan.
+
+Returns are measured at constant holdings: shares added or cleared
+between ticks (Portfolio.net_flow) are taken out of each tick's change,
+so only price moves count.
+"""
+
+import math
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class RunningStats:
+    """Incremental return statistics and drawdown for one value series"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.last_value = None
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+
+    def push_value(self, value):
+        """Record the next closing value; return the period return or None"""
+        result = None
+        if self.last_value:
+            result = value / self.last_value - 1.0
+            self.push_return(result)
+        self.last_value = value
+        self.peak = max(self.peak, value)
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - value) / self.peak)
+        return result
+
+    def push_growth(self, r):
+        """Record a period return by extending the value series by (1 + r)"""
+        return self.push_value(self.last_value * (1.0 + r))
+
+    def push_return(self, r):
+        self.count += 1
+        delta = r - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (r - self.mean)
+
+    @property
+    def volatility(self):
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1) * TRADING_DAYS)
+
+
+class PnLAnalytics:
+    """Cost-basis P&L, returns, volatility and drawdown for a portfolio"""
+
+    def __init__(self, portfolio, history):
+        self.portfolio = portfolio
+        self.history = history
+        self.stats = RunningStats()
+        self._mark()
+
+    def _mark(self):
+        """Start a new bar from the portfolio as it stands"""
+        self._bar_growth = 1.0
+        self._bar_ticks = 0
+        self._bar_partial = True
+        self._last_value = self.portfolio.total_value
+        self._last_flow = self.portfolio.net_flow
+
+    def summary(self):
+        """Portfolio-level P&L and the running return statistics"""
+        p = self.portfolio
+        pnl = p.unrealized_pnl
+        return {
+            "value": p.total_value,
+            "cost": p.total_cost,
+            "pnl": pnl,
+            "return": pnl / p.total_cost if p.total_cost else 0.0,
+            "volatility": self.stats.volatility,
+            "max_drawdown": self.stats.max_drawdown,
+        }
+
+    def on_prices(self, prices, timestamp):
+        """Feed a price tick: update bars, and close out the previous bar if one ended
+
+        The portfolio itself is revalued by the caller (Portfolio.update_prices);
+        this only keeps history and statistics in step.
+        """
+        p = self.portfolio
+        new_bars = self.history.record_ticks(prices, timestamp)
+        if new_bars and self._bar_ticks:
+            # A new bar started: everything before this tick belongs to the last one.
+            # The bar that was under way at _mark() only sets the starting value.
+            if not self._bar_partial:
+                self.stats.push_growth(self._bar_growth - 1.0)
+            elif self.stats.last_value is None:
+                self.stats.push_value(1.0)
+            self._bar_partial = False
+            self._bar_growth = 1.0
+        # Shares added or cleared since the last tick moved at the old prices
+        start = self._last_value + p.net_flow - self._last_flow
+        if start > 0:
+            self._bar_growth *= p.total_value / start
+        self._last_value = p.total_value
+        self._last_flow = p.net_flow
+        self._bar_ticks += 1
+        return new_bars
+
+    def rebuild(self):
+        """Recompute the running statistics from history for the current holdings
+
+        Closes are aligned on bar timestamps and forward-filled, then the
+        portfolio value series is a single matrix-vector product.
+        """
+        p = self.portfolio
+        held = [s for s in p.symbols if s in self.history]
+        self.stats = RunningStats()
+        self._mark()
+        if not held:
+            return
+        times = np.unique(np.concatenate([self.history.get(s).times for s in held]))
+        matrix = np.full((len(times), len(held)), np.nan)
+        for j, symbol in enumerate(held):
+            series = self.history.get(symbol)
+            matrix[np.searchsorted(times, series.times), j] = series.closes
+        # Forward-fill gaps, then back-fill leading gaps with the first close
+        for j in range(len(held)):
+            column = matrix[:, j]
+            valid = ~np.isnan(column)
+            idx = np.where(valid, np.arange(len(column)), 0)
+            np.maximum.accumulate(idx, out=idx)
+            column[:] = column[idx]
+            first = column[valid.argmax()]
+            column[np.isnan(column)] = first
+        quantities = np.array([p.quantity(s) for s in held], dtype=np.float64)
+        for value in matrix @ quantities:
+            self.stats.push_value(float(value))
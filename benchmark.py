@@ -0,0 +1,257 @@
+"""Headless benchmarks for the portfolio window's actions
+
+Loads Stock-Portfolio.py against the stub widget layer in tk_stub (or real
+Tk with --real-tk, e.g. under xvfb-run), fills the active account with a
+synthetic book of each requested size and times the button callbacks,
+including the redraw work they queue:
+
+    python benchmark.py --sizes 10,1000,100000 --output bench.json
+    python benchmark.py --compare baseline.json bench.json
+
+Each result records latency percentiles; --tracemalloc adds the peak
+traced memory per action and --profile writes a cProfile dump per action
+and size next to the JSON output.
+"""
+
+import argparse
+import cProfile
+import importlib.util
+import json
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Stock-Portfolio.py")
+ACTIONS = ("add_to_portfolio", "calculate_total", "save_to_file", "preview_report")
+DEFAULT_SIZES = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+PROFILE_TOP = 15
+
+
+def load_app(real_tk=False):
+    """Import Stock-Portfolio.py as a module, over the stub widgets unless real_tk"""
+    if not real_tk:
+        import tk_stub
+        tk_stub.install()
+    spec = importlib.util.spec_from_file_location("stock_portfolio_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Harness:
+    """One app instance holding a synthetic book of a given size"""
+
+    def __init__(self, module, size, workdir, real_tk=False, seed=0):
+        self.module = module
+        self.size = size
+        module.PORTFOLIO_DB = os.path.join(workdir, f"bench_{size}.db")
+        module.PRICE_HISTORY_DIR = os.path.join(workdir, "price_history")
+        if real_tk:
+            import tkinter
+            self.root = tkinter.Tk()
+            self.run_pending = self.root.update
+        else:
+            import tk_stub
+            self.root = tk_stub.Tk()
+            self.run_pending = tk_stub.LOOP.run_pending
+        self.app = module.StockPortfolioTracker(self.root)
+        self.run_pending()
+        self.rng = np.random.default_rng(seed)
+        self.symbols = self._populate(size)
+
+    def _populate(self, size):
+        app = self.app
+        symbols = [f"S{i:07d}" for i in range(size)]
+        prices = self.rng.uniform(10, 5000, size).round(2)
+        app.accounts.update_prices(app.pricing.update_quotes(dict(zip(symbols, prices.tolist()))))
+        app.accounts.add_many(app.account, symbols, self.rng.integers(1, 1000, size).tolist())
+        app.analytics.rebuild()
+        app.portfolio_view.reset()
+        self.run_pending()
+        return symbols
+
+    def add_to_portfolio(self):
+        self.app.stock_var.set(self.symbols[int(self.rng.integers(len(self.symbols)))])
+        self.app.quantity_var.set("5")
+        self.app.add_to_portfolio()
+
+    def calculate_total(self):
+        self.app.calculate_total()
+
+    def save_to_file(self):
+        self.app.save_to_file()
+
+    def preview_report(self):
+        self.app.preview_report()
+
+    def time_action(self, action, repeat, budget):
+        """Return per-call latencies in seconds (at least 3, at most repeat)"""
+        call = getattr(self, action)
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < repeat:
+            t0 = time.perf_counter()
+            call()
+            self.run_pending()
+            samples.append(time.perf_counter() - t0)
+            if len(samples) >= 3 and time.perf_counter() - started > budget:
+                break
+        return samples
+
+    def close(self):
+        self.app.on_close()
+
+
+def summarize(samples):
+    ms = np.asarray(samples) * 1e3
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"samples": len(ms), "mean_ms": round(float(ms.mean()), 4),
+            "p50_ms": round(float(p50), 4), "p90_ms": round(float(p90), 4),
+            "p99_ms": round(float(p99), 4), "max_ms": round(float(ms.max()), 4)}
+
+
+def profile_top(profiler, limit=PROFILE_TOP):
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{"function": f"{os.path.basename(file)}:{line}({name})", "calls": calls,
+             "cumulative_ms": round(cumulative * 1e3, 3)}
+            for (file, line, name), (_, calls, _, cumulative, _) in rows]
+
+
+def max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(APP_PATH), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, actions=ACTIONS, repeat=20, budget=5.0, real_tk=False,
+        trace_memory=False, profile_dir=None, seed=0):
+    """Benchmark every action at every size and return the JSON-ready results"""
+    workdir = tempfile.mkdtemp(prefix="portfolio-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # save_to_file writes into the working directory
+    try:
+        module = load_app(real_tk)
+        results = []
+        for size in sizes:
+            harness = Harness(module, size, workdir, real_tk, seed)
+            for action in actions:
+                if trace_memory:
+                    tracemalloc.start()
+                profiler = cProfile.Profile() if profile_dir else None
+                if profiler:
+                    profiler.enable()
+                samples = harness.time_action(action, repeat, budget)
+                if profiler:
+                    profiler.disable()
+                result = {"size": size, "action": action, **summarize(samples)}
+                if trace_memory:
+                    result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                if profiler:
+                    path = os.path.join(profile_dir, f"{action}_{size}.prof")
+                    profiler.dump_stats(path)
+                    result["profile"] = path
+                    result["profile_top"] = profile_top(profiler)
+                result["max_rss_kb"] = max_rss_kb()
+                results.append(result)
+                print(f"{size:>9,} {action:<18} p50 {result['p50_ms']:>10.3f} ms  "
+                      f"p99 {result['p99_ms']:>10.3f} ms  ({result['samples']} runs)", file=sys.stderr)
+                for name in os.listdir(workdir):
+                    if name.startswith("portfolio_"):
+                        os.remove(os.path.join(workdir, name))
+            harness.close()
+    finally:
+        os.chdir(cwd)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "widgets": "tk" if real_tk else "stub",
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=1.2, metric="p50_ms"):
+    """Pair results by (size, action); return rows with the current/baseline ratio"""
+    old = {(r["size"], r["action"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = old.get((result["size"], result["action"]))
+        if before is None:
+            continue
+        ratio = result[metric] / before[metric] if before[metric] else float("inf")
+        rows.append({"size": result["size"], "action": result["action"],
+                     "baseline_ms": before[metric], "current_ms": result[metric],
+                     "ratio": round(ratio, 3), "regressed": ratio > threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless portfolio UI benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated portfolio sizes")
+    parser.add_argument("--actions", default=",".join(ACTIONS))
+    parser.add_argument("--repeat", type=int, default=20, help="maximum runs per action")
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="seconds per action and size after the first 3 runs")
+    parser.add_argument("--real-tk", action="store_true", help="use real Tk (needs a display)")
+    parser.add_argument("--tracemalloc", action="store_true", help="record peak traced memory")
+    parser.add_argument("--profile", action="store_true", help="write cProfile dumps")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="p50 ratio above which --compare reports a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            current = json.load(file)
+        rows = compare(baseline, current, args.threshold)
+        for row in rows:
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"{row['size']:>9,} {row['action']:<18} {row['baseline_ms']:>10.3f} -> "
+                  f"{row['current_ms']:>10.3f} ms  x{row['ratio']:.2f}{flag}")
+        sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+    profile_dir = None
+    if args.profile:
+        profile_dir = os.path.dirname(os.path.abspath(args.output or "bench.json"))
+    results = run([int(s) for s in args.sizes.split(",")], args.actions.split(","),
+                  args.repeat, args.budget, args.real_tk, args.tracemalloc, profile_dir)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
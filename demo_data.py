@@ -0,0 +1,40 @@
+"""The built-in demo universe, shared by the window and the fake quote server"""
+
+# Prices in each stock's trading currency
+DEMO_PRICES = {
+    "AAPL": 180.73,     # Apple Inc. (USD)
+    "TSLA": 251.51,     # Tesla Inc. (USD)
+    "MSFT": 341.58,     # Microsoft (USD)
+    "GOOGL": 146.39,    # Alphabet (Google) (USD)
+    "AMZN": 176.01,     # Amazon (USD)
+    "NVDA": 954.43,     # NVIDIA (USD)
+    "META": 487.20,     # Meta Platforms (USD)
+    "RELIANCE": 2850.60, # Reliance Industries
+    "TCS": 3850.75,     # Tata Consultancy Services
+    "INFY": 1650.25,    # Infosys
+    "HDFCBANK": 1750.40, # HDFC Bank
+    "WIPRO": 525.30,    # Wipro
+    "HINDUNILVR": 2450.80, # Hindustan Unilever
+    "ITC": 435.60,      # ITC Limited
+    "SBIN": 650.75      # State Bank of India
+}
+
+DEMO_CURRENCIES = dict.fromkeys(["AAPL", "TSLA", "MSFT", "GOOGL", "AMZN", "NVDA", "META"], "USD")
+
+DEMO_COMPANY_NAMES = {
+    "AAPL": "Apple Inc.",
+    "TSLA": "Tesla Inc.",
+    "MSFT": "Microsoft",
+    "GOOGL": "Alphabet (Google)",
+    "AMZN": "Amazon",
+    "NVDA": "NVIDIA",
+    "META": "Meta Platforms",
+    "RELIANCE": "Reliance Industries",
+    "TCS": "Tata Consultancy Services",
+    "INFY": "Infosys",
+    "HDFCBANK": "HDFC Bank",
+    "WIPRO": "Wipro",
+    "HINDUNILVR": "Hindustan Unilever",
+    "ITC": "ITC Limited",
+    "SBIN": "State Bank of India"
+}
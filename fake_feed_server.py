@@ -0,0 +1,98 @@
+"""Local fake quote server for exercising the live price feed
+
+Serves GET /quotes?symbols=A,B,C with a JSON object of prices that take a
+small random walk on every request. Prices start from the app's demo
+table (or a price file given with --prices) and FX pairs such as USDINR
+from realistic rates; symbols the server has no price for are left out
+of the answer. Run it and point the app at it:
+
+    python fake_feed_server.py --port 8765
+    PRICE_FEED_URL=http://127.0.0.1:8765 python Stock-Portfolio.py
+"""
+
+import argparse
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from demo_data import DEMO_PRICES
+
+FX_RATES = {"USDINR": 83.0, "EURINR": 90.0, "GBPINR": 105.0}
+
+
+class FakeQuoteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, base_prices=None, volatility=0.002, seed=None):
+        super().__init__(address, QuoteHandler)
+        self.prices = {**FX_RATES, **(DEMO_PRICES if base_prices is None else base_prices)}
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def quotes(self, symbols):
+        with self.lock:
+            result = {}
+            for symbol in symbols:
+                price = self.prices.get(symbol)
+                if price is None:
+                    continue
+                price *= 1 + self.random.gauss(0, self.volatility)
+                self.prices[symbol] = price
+                result[symbol] = round(price, 2)
+            return result
+
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/quotes":
+            self.send_error(404)
+            return
+        symbols = [s for s in parse_qs(url.query).get("symbols", [""])[0].split(",") if s]
+        body = json.dumps(self.server.quotes(symbols)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_feed(host="127.0.0.1", port=0, base_prices=None, seed=None):
+    """Start a server on a background thread; return (server, base_url)"""
+    server = FakeQuoteServer((host, port), base_prices, seed=seed)
+    threading.Thread(target=server.serve_forever, name="fake-feed", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake stock quote server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--prices", help="starting prices (CSV or JSON, as for portfolio_cli.py) "
+                                         "instead of the demo table")
+    args = parser.parse_args()
+    base_prices = None
+    if args.prices:
+        from portfolio_cli import load_prices
+        try:
+            base_prices = load_prices(args.prices)[0]
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"error: {e}\n")
+    server = FakeQuoteServer((args.host, args.port), base_prices)
+    print(f"Serving quotes on http://{args.host}:{args.port}/quotes")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Native-currency prices and a timestamped FX rate cache
+
+The books (costs, values, history, risk) stay in one base currency. Each
+symbol is quoted in its own currency; NativePrices keeps those quotes
+grouped into currency buckets and derives the base-currency price table
+from them, converting one whole bucket with a single vectorized multiply.
+When one FX rate moves, only that bucket is re-priced.
+
+FxCache holds the rates. Live rates carry a timestamp and are evicted
+once older than max_age, after which the configured default rate for
+that currency applies again.
+"""
+
+import math
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from inr_format import CACHE_SIZE, format_inr, format_inr_column, format_total
+
+BASE_CURRENCY = "INR"
+DEFAULT_RATES = {"USD": 83.0, "EUR": 90.0, "GBP": 105.0}  # rupees per unit
+CURRENCY_SYMBOLS = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£"}
+CURRENCY_NAMES = {"INR": "INDIAN RUPEES", "USD": "US DOLLARS", "EUR": "EUROS",
+                  "GBP": "POUNDS STERLING"}
+
+
+def fx_pair(currency, base=BASE_CURRENCY):
+    """Feed symbol for a rate quote, e.g. USDINR"""
+    return f"{currency}{base}"
+
+
+class FxCache:
+    """Rates as base-currency units per unit of each currency
+
+    Rates without a timestamp (defaults) never go stale.
+    """
+
+    def __init__(self, base=BASE_CURRENCY, max_age=None, defaults=None):
+        self.base = base
+        self.max_age = max_age
+        self.defaults = dict(defaults or {})
+        self.live = {}  # currency -> (rate, timestamp)
+
+    def currencies(self):
+        return [self.base] + [c for c in dict.fromkeys([*self.defaults, *self.live]) if c != self.base]
+
+    def rate(self, currency, now=None):
+        """Base units per unit of currency; KeyError if no usable rate"""
+        if currency == self.base:
+            return 1.0
+        entry = self.live.get(currency)
+        if entry is not None:
+            rate, timestamp = entry
+            if self.max_age is None or (now or time.time()) - timestamp <= self.max_age:
+                return rate
+        return self.defaults[currency]
+
+    def cross(self, from_currency, to_currency, now=None):
+        """Units of to_currency per unit of from_currency"""
+        return self.rate(from_currency, now) / self.rate(to_currency, now)
+
+    def update(self, rates, timestamp=None):
+        """Store {currency: rate} quotes; return the currencies whose rate changed"""
+        timestamp = time.time() if timestamp is None else timestamp
+        changed = []
+        for currency, rate in rates.items():
+            if not (math.isfinite(rate) and rate > 0) or currency == self.base:
+                continue
+            try:
+                previous = self.rate(currency, timestamp)
+            except KeyError:
+                previous = None
+            self.live[currency] = (float(rate), timestamp)
+            if previous != rate:
+                changed.append(currency)
+        return changed
+
+    def evict_stale(self, now=None):
+        """Drop expired live rates; return the currencies whose rate changed"""
+        if self.max_age is None:
+            return []
+        now = now or time.time()
+        expired = [c for c, (_, timestamp) in self.live.items() if now - timestamp > self.max_age]
+        changed = []
+        for currency in expired:
+            rate, _ = self.live.pop(currency)
+            if self.defaults.get(currency) != rate:
+                changed.append(currency)
+        return changed
+
+
+class NativePrices:
+    """Native quotes per symbol and the base-currency table derived from them
+
+    base_prices is updated in place, so it can be handed to Portfolio or
+    AccountBook as their shared price table.
+    """
+
+    def __init__(self, native, currencies, fx):
+        self.native = dict(native)
+        self.currencies = {s: currencies.get(s, fx.base) for s in self.native}
+        self.fx = fx
+        self.buckets = {}
+        for symbol, currency in self.currencies.items():
+            self.buckets.setdefault(currency, []).append(symbol)
+        self.base_prices = {}
+        for currency in self.buckets:
+            self.base_prices.update(self.rebase(currency))
+
+    def currency(self, symbol):
+        return self.currencies.get(symbol, self.fx.base)
+
+    def _convert(self, symbols, currency):
+        rate = self.fx.rate(currency)
+        native = np.fromiter(map(self.native.__getitem__, symbols), dtype=np.float64, count=len(symbols))
+        return dict(zip(symbols, (native * rate).tolist()))
+
+    def rebase(self, currency):
+        """Base prices for every symbol quoted in currency, at its current rate"""
+        return self._convert(self.buckets.get(currency, []), currency)
+
+    def update_quotes(self, quotes):
+        """Store native {symbol: price} quotes; return their base-currency prices
+
+        Unknown symbols are taken to be quoted in the base currency.
+        """
+        grouped = {}
+        for symbol, price in quotes.items():
+            if symbol not in self.currencies:
+                self.currencies[symbol] = self.fx.base
+                self.buckets.setdefault(self.fx.base, []).append(symbol)
+            self.native[symbol] = price
+            grouped.setdefault(self.currencies[symbol], []).append(symbol)
+        converted = {}
+        for currency, symbols in grouped.items():
+            converted.update(self._convert(symbols, currency))
+        return converted
+
+    def bucket_values(self, portfolio):
+        """Return {currency: holdings value in that currency} for a Portfolio
+
+        Only the foreign buckets are looked up row by row (one gather and
+        sum each); the base bucket is whatever remains of the total.
+        """
+        if not portfolio:
+            return {}
+        base = self.fx.base
+        values = portfolio.values
+        totals = {}
+        remaining = float(values.sum())
+        foreign_rows = 0
+        for currency, symbols in self.buckets.items():
+            if currency == base:
+                continue
+            rows = [portfolio.index[s] for s in symbols if s in portfolio.index]
+            foreign_rows += len(rows)
+            if rows:
+                value = float(values[rows].sum())
+                remaining -= value
+                totals[currency] = value / self.fx.rate(currency)
+        if foreign_rows < len(portfolio):
+            totals[base] = remaining
+        return totals
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_money(amount, currency=BASE_CURRENCY):
+    """Format an amount in a currency: Indian grouping for INR, thousands otherwise"""
+    if currency == "INR":
+        return format_inr(amount)
+    symbol = CURRENCY_SYMBOLS.get(currency, currency + " ")
+    text = f"{abs(amount):,.2f}"
+    sign = "-" if amount < 0 and text != "0.00" else ""
+    return f"{sign}{symbol}{text}"
+
+
+def format_money_column(amounts, currency=BASE_CURRENCY):
+    """Format a sequence (or NumPy array) of amounts in one call"""
+    if currency == "INR":
+        return format_inr_column(amounts)
+    if hasattr(amounts, "tolist"):
+        amounts = amounts.tolist()
+    return [format_money(amount, currency) for amount in amounts]
+
+
+def format_money_total(amount, currency=BASE_CURRENCY):
+    """format_total for INR (with lakh/crore wording), format_money otherwise"""
+    if currency == "INR":
+        return format_total(amount)
+    return format_money(amount, currency)
@@ -0,0 +1,58 @@
+"""Indian-style rupee formatting (2-2-3 digit grouping, lakhs and crores)
+
+Formatted strings are memoized in a bounded LRU cache because the same
+prices and values are redrawn over and over while rows refresh.
+"""
+
+from functools import lru_cache
+
+LAKH = 100000
+CRORE = 10000000
+CACHE_SIZE = 65536
+
+
+def group_indian(digits):
+    """Insert Indian thousands separators into a string of digits"""
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.append(head[-2:])
+        head = head[:-2]
+    if head:
+        groups.append(head)
+    return ",".join(reversed(groups)) + "," + tail
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_inr(amount):
+    """Format an amount as ₹12,34,567.89"""
+    text = f"{abs(amount):.2f}"
+    whole, fraction = text.split(".")
+    sign = "-" if amount < 0 and text != "0.00" else ""
+    return f"{sign}₹{group_indian(whole)}.{fraction}"
+
+
+def format_inr_column(amounts):
+    """Format a sequence (or NumPy array) of amounts in one call"""
+    if hasattr(amounts, "tolist"):
+        amounts = amounts.tolist()
+    return list(map(format_inr, amounts))
+
+
+def format_words(amount):
+    """Return the lakh/crore wording for an amount, or None below one lakh"""
+    if amount >= CRORE:
+        return f"₹{amount / CRORE:.2f} Crores"
+    if amount >= LAKH:
+        return f"₹{amount / LAKH:.2f} Lakhs"
+    return None
+
+
+def format_total(amount):
+    """Format a total with its lakh/crore wording when large enough"""
+    words = format_words(amount)
+    if words:
+        return f"{format_inr(amount)} ({words})"
+    return format_inr(amount)
@@ -0,0 +1,131 @@
+"""Lightweight timing of UI actions into fixed-size ring buffers
+
+Wrap a callback with @timed("action") or a block with measure("action")
+and each call's duration lands in that action's ring of the last
+RING_SIZE samples. While TIMINGS.enabled is False the wrappers only test
+that flag, so instrumentation can stay in place permanently.
+
+LagMonitor measures Tk event-loop lag: how late a periodic after()
+callback actually runs compared to when it was due.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+RING_SIZE = 512
+LAG_ACTION = "loop lag"
+
+
+class Ring:
+    """The most recent samples of one action, in seconds"""
+
+    def __init__(self, size=RING_SIZE):
+        self.samples = np.zeros(size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    @property
+    def last(self):
+        return float(self.samples[(self.count - 1) % len(self.samples)]) if self.count else 0.0
+
+    def values(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+
+class Timings:
+    """Per-action rings plus the switch that turns recording on"""
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.enabled = False
+        self.rings = {}
+
+    def record(self, action, seconds):
+        ring = self.rings.get(action)
+        if ring is None:
+            ring = self.rings[action] = Ring(self.size)
+        ring.add(seconds)
+
+    def clear(self):
+        self.rings.clear()
+
+    def stats(self):
+        """Return {action: (last_ms, p50_ms, p99_ms, count)}"""
+        result = {}
+        for action, ring in self.rings.items():
+            p50, p99 = np.percentile(ring.values(), [50, 99]) * 1e3
+            result[action] = (ring.last * 1e3, float(p50), float(p99), ring.count)
+        return result
+
+    def timed(self, action):
+        """Decorator recording each call of the wrapped function under action"""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(action, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def measure(self, action):
+        """Context manager recording the duration of its block under action"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(action, time.perf_counter() - started)
+
+
+TIMINGS = Timings()
+timed = TIMINGS.timed
+measure = TIMINGS.measure
+
+
+class LagMonitor:
+    """Records how late a periodic Tk callback runs as LAG_ACTION"""
+
+    def __init__(self, widget, timings=TIMINGS, interval_ms=100):
+        self.widget = widget
+        self.timings = timings
+        self.interval_ms = interval_ms
+        self._pending = None
+        self._due = 0.0
+
+    def start(self):
+        if self._pending is None:
+            self._schedule()
+
+    def stop(self):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.interval_ms / 1000
+        self._pending = self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.timings.record(LAG_ACTION, max(0.0, time.perf_counter() - self._due))
+        self._schedule()
+
+
+def format_stats(stats):
+    """One-line summary: action last/p50/p99 in ms"""
+    parts = [f"{action} {last:.1f}/{p50:.1f}/{p99:.1f}"
+             for action, (last, p50, p99, _) in stats.items()]
+    return "last/p50/p99 ms  " + "  |  ".join(parts) if parts else "No timings yet"
@@ -0,0 +1,249 @@
+"""Headless valuation of portfolio files, for servers and scheduled runs
+
+Values each holdings file (any broker CSV/JSON export the Import button
+accepts) against a price file and writes its report, in the Save Report
+layout (txt) or as csv/json/html. Files are spread over a process pool,
+and nothing here imports tkinter:
+
+    python portfolio_cli.py --prices prices.csv --output-dir reports clients/*.csv
+    python portfolio_cli.py --prices prices.json --format json --currency USD clients/
+
+The price file is a CSV with symbol and price columns (and optionally a
+currency column), a JSON object {symbol: price}, or a JSON array of
+{"symbol", "price", "currency"} records. Prices are in rupees unless a
+currency is given; --fx USD=83.5 overrides the built-in rates.
+
+Reports keep the input's name and its path below a directory argument,
+so clients/a/x.csv becomes reports/a/x.csv.txt.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from fx import BASE_CURRENCY, DEFAULT_RATES, FxCache, NativePrices
+from portfolio_core import Portfolio
+from portfolio_import import SYMBOL_FIELDS, import_holdings
+from reports import FORMATS, ReportData, render, write_report
+
+PRICE_FIELDS = ("price", "close", "last", "ltp")
+CURRENCY_FIELDS = ("currency", "ccy")
+HOLDINGS_SUFFIXES = (".csv", ".json", ".jsonl", ".ndjson")
+
+# Per-process state set up once by _init_worker
+_prices = None
+_fx = None
+
+
+def _field(names, candidates):
+    return next((i for i, name in enumerate(names) if name.strip().lower() in candidates), None)
+
+
+def load_prices(path):
+    """Return ({symbol: native price}, {symbol: currency}) from a price file"""
+    prices = {}
+    currencies = {}
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        if path.lower().endswith(".json"):
+            data = json.load(file)
+            records = data.items() if isinstance(data, dict) else (
+                (r.get("symbol"), r) for r in data if isinstance(r, dict))
+            for symbol, record in records:
+                if isinstance(record, dict):
+                    price, currency = record.get("price"), record.get("currency")
+                else:
+                    price, currency = record, None
+                if symbol and price is not None:
+                    symbol = str(symbol).strip().upper()
+                    try:
+                        prices[symbol] = float(price)
+                    except (TypeError, ValueError):
+                        raise ValueError(f"{path}: bad price for {symbol}") from None
+                    if currency:
+                        currencies[symbol] = str(currency).upper()
+            return prices, currencies
+
+        reader = csv.reader(file)
+        header = next(reader, [])
+        symbol_col = _field(header, SYMBOL_FIELDS)
+        price_col = _field(header, PRICE_FIELDS)
+        currency_col = _field(header, CURRENCY_FIELDS)
+        if symbol_col is None or price_col is None:
+            raise ValueError(f"{path}: expected symbol and price columns")
+        for number, fields in enumerate(reader, start=2):
+            if not fields:
+                continue
+            try:
+                symbol = fields[symbol_col].strip().upper()
+                prices[symbol] = float(fields[price_col])
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}: bad price on line {number}") from None
+            if currency_col is not None and currency_col < len(fields) and fields[currency_col].strip():
+                currencies[symbol] = fields[currency_col].strip().upper()
+    return prices, currencies
+
+
+def _init_worker(native, currencies, rates):
+    global _prices, _fx
+    _fx = FxCache(defaults=rates)
+    _prices = NativePrices(native, currencies, _fx).base_prices
+
+
+def value_file(path, output, fmt="txt", currency=BASE_CURRENCY):
+    """Import one holdings file and write its report to output; return a summary dict"""
+    result = {"path": path}
+    try:
+        report = import_holdings(path, _prices)
+        if report.failed:
+            result["error"] = report.fatal
+            return result
+        portfolio = Portfolio(_prices)
+        if report.totals:
+            portfolio.add_many(list(report.totals), list(report.totals.values()))
+        data = ReportData(portfolio, currency=currency, rate=_fx.rate(currency))
+        with open(output, "w", encoding="utf-8") as file:
+            write_report(render(data, fmt), file.write)
+    except (OSError, KeyError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    result.update({"output": output, "positions": len(portfolio),
+                   "total_value": round(data.total_value, 2), "currency": currency,
+                   "rows_read": report.rows_read, "rows_rejected": report.error_count})
+    return result
+
+
+def _value_chunk(jobs, fmt, currency):
+    return [value_file(path, output, fmt, currency) for path, output in jobs]
+
+
+def collect_files(paths):
+    """Expand directories into the holdings files below them
+
+    Returns (path, name) pairs, name being the path relative to the
+    directory argument it was found under (or the file's own name).
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append((path, os.path.basename(path)))
+            continue
+        found = []
+        for folder, _, names in os.walk(path):
+            found.extend(os.path.join(folder, name) for name in names
+                         if name.lower().endswith(HOLDINGS_SUFFIXES))
+        files.extend((file, os.path.relpath(file, path)) for file in sorted(found))
+    return files
+
+
+def output_paths(files, output_dir, fmt):
+    """Map (path, name) pairs to report paths; ValueError if two would collide"""
+    outputs = {}
+    for path, name in files:
+        output = os.path.join(output_dir, f"{name}.{fmt}")
+        key = os.path.normcase(os.path.normpath(output))
+        if key in outputs:
+            raise ValueError(f"{outputs[key][0]} and {path} would both be written to {output}")
+        outputs[key] = (path, output)
+    return list(outputs.values())
+
+
+def run_batch(files, price_path, output_dir, fmt="txt", currency=BASE_CURRENCY,
+              rates=None, workers=None, on_result=None):
+    """Value every (path, name) pair from collect_files
+
+    on_result(summary) is called as each file finishes; workers=1 runs
+    in-process without a pool.
+    """
+    jobs = output_paths(files, output_dir, fmt)
+    native, currencies = load_prices(price_path)
+    rates = {**DEFAULT_RATES, **(rates or {})}
+    for needed in {currency, *currencies.values()} - {BASE_CURRENCY}:
+        if needed not in rates:
+            raise ValueError(f"No FX rate for {needed}; pass --fx {needed}=RATE")
+        if rates[needed] <= 0:
+            raise ValueError(f"FX rate for {needed} must be positive")
+    for folder in {os.path.dirname(output) for _, output in jobs}:
+        os.makedirs(folder, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    results = []
+
+    def collect(summaries):
+        for summary in summaries:
+            results.append(summary)
+            if on_result:
+                on_result(summary)
+
+    if workers == 1:
+        _init_worker(native, currencies, rates)
+        for path, output in jobs:
+            collect([value_file(path, output, fmt, currency)])
+        return results
+
+    # A few chunks per worker keep the pool busy without a round trip per file
+    size = max(1, len(jobs) // (workers * 4))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(native, currencies, rates)) as pool:
+        task = partial(_value_chunk, fmt=fmt, currency=currency)
+        for summaries in pool.map(task, chunks):
+            collect(summaries)
+    return results
+
+
+def _parse_rate(text):
+    currency, _, rate = text.partition("=")
+    try:
+        rate = float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected CUR=RATE, got {text!r}") from None
+    if not rate > 0:
+        raise argparse.ArgumentTypeError(f"rate must be positive, got {text!r}")
+    return currency.strip().upper(), rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value portfolio files and write reports (no GUI)")
+    parser.add_argument("holdings", nargs="+", help="holdings files or directories of them")
+    parser.add_argument("--prices", required=True, help="price file (CSV or JSON)")
+    parser.add_argument("--format", choices=FORMATS, default="txt")
+    parser.add_argument("--currency", default=BASE_CURRENCY, type=str.upper,
+                        help="reporting currency")
+    parser.add_argument("--fx", action="append", type=_parse_rate, default=[],
+                        metavar="CUR=RATE", help="rupees per unit of CUR (repeatable)")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--summary", help="also write the per-file results as JSON here")
+    args = parser.parse_args()
+
+    files = collect_files(args.holdings)
+    if not files:
+        parser.error("no holdings files found")
+
+    def show(summary):
+        if "error" in summary:
+            print(f"FAILED {summary['path']}: {summary['error']}", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        results = run_batch(files, args.prices, args.output_dir, args.format, args.currency,
+                            dict(args.fx), args.workers, on_result=show)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"error: {e}\n")
+    failed = sum("error" in r for r in results)
+    print(f"Valued {len(results) - failed:,} of {len(results):,} portfolios into "
+          f"{args.output_dir} in {time.perf_counter() - started:.2f}s")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
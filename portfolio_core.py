@@ -0,0 +1,266 @@
+"""Headless portfolio valuation engine (no Tkinter dependency)"""
+
+from datetime import date
+
+import numpy as np
+
+# Largest position in one symbol; keeps quantities, their sums and their
+# values exact in the int64/float64 columns
+MAX_QUANTITY = 10 ** 12
+
+
+def validate_holding(stock, quantity, prices):
+    """Check a (stock, quantity) entry and return it as (str, int)
+
+    Raises ValueError with a user-facing message when the entry is invalid.
+    """
+    stock = (stock or "").strip()
+    if stock == "Select Stock" or not stock:
+        raise ValueError("Please select a stock symbol!")
+    if stock not in prices:
+        raise ValueError(f"Unknown stock symbol: {stock}")
+
+    quantity_str = str(quantity).strip()
+    if not quantity_str.isdigit():
+        raise ValueError("Please enter a valid quantity (whole number)!")
+
+    quantity = int(quantity_str)
+    if quantity <= 0:
+        raise ValueError("Quantity must be greater than 0!")
+    if quantity > MAX_QUANTITY:
+        raise ValueError(f"Quantity must be at most {MAX_QUANTITY:,}!")
+    return stock, quantity
+
+
+class Portfolio:
+    """Columnar holdings store valued against a price table
+
+    Each symbol owns a row; quantity, price, value, cost basis and first
+    purchase date live in parallel NumPy arrays so whole-portfolio queries
+    are single vectorized calls. The running totals are kept up to date on
+    every add.
+
+    net_flow accumulates the market value of shares added (less shares
+    cleared) at the prices of the moment, so value changes caused by the
+    user can be told apart from price moves.
+    """
+
+    def __init__(self, prices, capacity=64):
+        self.prices = prices
+        self.index = {}
+        self.symbols = []
+        self._quantity = np.zeros(capacity, dtype=np.int64)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._value = np.zeros(capacity, dtype=np.float64)
+        self._cost = np.zeros(capacity, dtype=np.float64)
+        self._purchased = np.zeros(capacity, dtype=np.int64)  # date ordinals
+        self.total_value = 0.0
+        self.total_cost = 0.0
+        self.net_flow = 0.0
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    @property
+    def quantities(self):
+        return self._quantity[:len(self.symbols)]
+
+    @property
+    def price_column(self):
+        return self._price[:len(self.symbols)]
+
+    @property
+    def values(self):
+        return self._value[:len(self.symbols)]
+
+    @property
+    def costs(self):
+        return self._cost[:len(self.symbols)]
+
+    @property
+    def purchase_ordinals(self):
+        return self._purchased[:len(self.symbols)]
+
+    def _grow(self, needed):
+        capacity = len(self._quantity)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_quantity", "_price", "_value", "_cost", "_purchased"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _row(self, symbol, purchased):
+        """Return the row for symbol, appending a new one if needed"""
+        row = self.index.get(symbol)
+        if row is None:
+            price = self.prices[symbol]
+            row = len(self.symbols)
+            self._grow(row + 1)
+            self.index[symbol] = row
+            self.symbols.append(symbol)
+            self._quantity[row] = 0
+            self._price[row] = price
+            self._value[row] = 0.0
+            self._cost[row] = 0.0
+            self._purchased[row] = purchased
+        return row
+
+    def add(self, symbol, quantity, cost=None, purchased=None):
+        """Add shares of a symbol and return the new quantity held
+
+        cost is the total amount paid (defaults to the current price) and
+        purchased the purchase date (defaults to today). Raises ValueError,
+        before anything changes, if the position would exceed MAX_QUANTITY.
+        """
+        if not 0 <= self.quantity(symbol) + quantity <= MAX_QUANTITY:
+            raise ValueError(f"A position in {symbol} must be between 0 and {MAX_QUANTITY:,} shares")
+        row = self._row(symbol, (purchased or date.today()).toordinal())
+        self._quantity[row] += quantity
+        delta = self._price[row] * quantity
+        self._value[row] += delta
+        self.total_value += float(delta)
+        self.net_flow += float(delta)
+        paid = float(delta) if cost is None else float(cost)
+        self._cost[row] += paid
+        self.total_cost += paid
+        return int(self._quantity[row])
+
+    def add_many(self, symbols, quantities, costs=None, purchased=None):
+        """Add many (symbol, quantity) pairs in one vectorized pass
+
+        costs optionally gives the total paid per pair and purchased the
+        purchase date for new rows (one date, or one per pair); both
+        default as in add(). Raises before any row is created if a symbol
+        is unknown or a position would exceed MAX_QUANTITY.
+        """
+        index = self.index
+        before = self.total_value
+        start = len(self.symbols)
+        new_symbols = [s for s in dict.fromkeys(symbols) if s not in index]
+        new_prices = [self.prices[s] for s in new_symbols]
+        end = start + len(new_symbols)
+        new_rows = dict(zip(new_symbols, range(start, end)))
+        rows = np.fromiter((index[s] if s in index else new_rows[s] for s in symbols),
+                           dtype=np.intp, count=len(symbols))
+        # Whole shares are summed in int64; float weights lose precision above 2**53
+        try:
+            quantities = np.asarray(quantities, dtype=np.int64)
+        except OverflowError:
+            quantities = None
+        if quantities is None or len(quantities) and (quantities.min() < 0
+                                                      or quantities.max() > MAX_QUANTITY):
+            raise ValueError(f"Quantities must be between 0 and {MAX_QUANTITY:,} shares")
+        added = np.zeros(end, dtype=np.int64)
+        np.add.at(added, rows, quantities)
+        held = np.concatenate([self.quantities, np.zeros(end - start, dtype=np.int64)])
+        too_large = np.flatnonzero(held + added > MAX_QUANTITY)
+        if len(too_large):
+            symbol = (self.symbols + new_symbols)[too_large[0]]
+            raise ValueError(f"A position in {symbol} must be between 0 and {MAX_QUANTITY:,} shares")
+
+        self._grow(end)
+        index.update(new_rows)
+        self.symbols.extend(new_symbols)
+        self._quantity[start:end] = 0
+        self._price[start:end] = new_prices
+        self._cost[start:end] = 0.0
+        if purchased is None or isinstance(purchased, date):
+            self._purchased[start:end] = (purchased or date.today()).toordinal()
+        else:
+            # One date per pair; new rows take the date given with their symbol
+            dates = dict(zip(symbols, purchased))
+            self._purchased[start:end] = [dates[s].toordinal() for s in new_symbols]
+
+        if costs is None:
+            paid = np.bincount(rows, weights=quantities * self._price[rows], minlength=end)
+        else:
+            paid = np.bincount(rows, weights=np.asarray(costs, dtype=np.float64), minlength=end)
+        touched = np.flatnonzero(np.bincount(rows, minlength=end))
+        self._quantity[touched] += added[touched]
+        self._value[touched] = self._price[touched] * self._quantity[touched]
+        self._cost[touched] += paid[touched]
+        self.total_value = float(self.values.sum())
+        self.total_cost = float(self.costs.sum())
+        self.net_flow += self.total_value - before
+
+    def update_prices(self, updates):
+        """Apply {symbol: price} updates and return the held symbols that changed"""
+        self.prices.update(updates)
+        held = [s for s in updates if s in self.index]
+        if not held:
+            return held
+        rows = np.fromiter(map(self.index.__getitem__, held), dtype=np.intp, count=len(held))
+        old_values = self._value[rows]
+        self._price[rows] = np.fromiter(map(updates.__getitem__, held), dtype=np.float64, count=len(held))
+        self._value[rows] = self._price[rows] * self._quantity[rows]
+        self.total_value += float((self._value[rows] - old_values).sum())
+        return held
+
+    def clear(self):
+        """Remove every holding"""
+        self.net_flow -= self.total_value
+        self.index.clear()
+        self.symbols.clear()
+        self.total_value = 0.0
+        self.total_cost = 0.0
+
+    def quantity(self, symbol):
+        row = self.index.get(symbol)
+        return 0 if row is None else int(self._quantity[row])
+
+    def price(self, symbol):
+        row = self.index.get(symbol)
+        return self.prices[symbol] if row is None else float(self._price[row])
+
+    def position_value(self, symbol):
+        row = self.index.get(symbol)
+        return 0.0 if row is None else float(self._value[row])
+
+    def cost_basis(self, symbol):
+        row = self.index.get(symbol)
+        return 0.0 if row is None else float(self._cost[row])
+
+    def purchase_date(self, symbol):
+        row = self.index.get(symbol)
+        return None if row is None else date.fromordinal(int(self._purchased[row]))
+
+    @property
+    def unrealized_pnl(self):
+        return self.total_value - self.total_cost
+
+    @property
+    def total_shares(self):
+        return int(self.quantities.sum())
+
+    def position_chunks(self, chunk_size=4096):
+        """Yield (symbols, quantities, prices, values) column slices in insertion order
+
+        Working chunk by chunk lets callers process whole columns at once
+        without materialising a full copy of a large book.
+        """
+        for start in range(0, len(self.symbols), chunk_size):
+            end = min(start + chunk_size, len(self.symbols))
+            yield (self.symbols[start:end], self._quantity[start:end],
+                   self._price[start:end], self._value[start:end])
+
+    def positions(self):
+        """Yield (symbol, quantity, price, value) in insertion order"""
+        for symbols, quantities, prices, values in self.position_chunks():
+            yield from zip(symbols, quantities.tolist(), prices.tolist(), values.tolist())
+
+    def largest_holding(self):
+        """Return (symbol, value) of the most valuable position, or None"""
+        if not self.symbols:
+            return None
+        row = int(np.argmax(self.values))
+        return self.symbols[row], float(self._value[row])
@@ -0,0 +1,230 @@
+"""Streaming bulk import of holdings from broker CSV/JSON exports
+
+Rows are parsed lazily, validated with the same rules as the Add Stock
+form and aggregated per symbol. Bad rows are collected into an
+ImportReport instead of interrupting the import; a file that cannot be
+parsed to the end fails as a whole, so half a book is never added.
+"""
+
+import codecs
+import csv
+import json
+import os
+import queue
+import threading
+
+from portfolio_core import MAX_QUANTITY, validate_holding
+
+CHUNK_ROWS = 5000
+READ_BYTES = 1 << 16
+MAX_REPORTED_ERRORS = 1000
+
+SYMBOL_FIELDS = ("symbol", "stock", "ticker", "stock symbol")
+QUANTITY_FIELDS = ("quantity", "qty", "shares", "units")
+
+
+class ImportReport:
+    """Outcome of a bulk import: aggregated quantities plus row errors"""
+
+    def __init__(self, path):
+        self.path = path
+        self.totals = {}
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.error_count = 0
+        self.errors = []
+        self.cancelled = False
+        self.failed = False
+        self.fatal = None  # why the file could not be read, when failed
+
+    def add_error(self, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, message))
+
+    def summary(self, limit=10):
+        lines = [
+            f"File: {os.path.basename(self.path)}",
+            f"Rows read: {self.rows_read:,}",
+            f"Rows imported: {self.rows_imported:,} ({len(self.totals):,} stocks)",
+            f"Rows rejected: {self.error_count:,}",
+        ]
+        if self.cancelled:
+            lines.append("Import was cancelled; nothing was added.")
+        if self.failed:
+            lines.append("The file could not be read to the end; nothing was added.")
+        for row, message in self.errors[:limit]:
+            lines.append(f"  Row {row}: {message}")
+        if self.error_count > limit:
+            lines.append(f"  ... and {self.error_count - limit:,} more")
+        return "\n".join(lines)
+
+
+def _pick(fields, names, default):
+    for i, field in enumerate(fields):
+        if field.strip().lower() in names:
+            return i
+    return default
+
+
+def _read_lines(file, progress):
+    """Decode a binary file line by line, reporting bytes consumed"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for raw in file:
+        progress(len(raw))
+        yield decoder.decode(raw)
+
+
+def iter_csv_rows(file, progress):
+    """Yield (row_number, symbol, quantity) from a CSV export"""
+    reader = csv.reader(_read_lines(file, progress))
+    header = next(reader, None)
+    if header is None:
+        return
+    symbol_col = _pick(header, SYMBOL_FIELDS, None)
+    quantity_col = _pick(header, QUANTITY_FIELDS, None)
+    if symbol_col is None or quantity_col is None:
+        # No recognisable header: treat the first row as data
+        symbol_col, quantity_col = 0, 1
+        yield 1, *_csv_fields(header, symbol_col, quantity_col)
+    for number, fields in enumerate(reader, start=2):
+        if fields:
+            yield number, *_csv_fields(fields, symbol_col, quantity_col)
+
+
+def _csv_fields(fields, symbol_col, quantity_col):
+    symbol = fields[symbol_col] if symbol_col < len(fields) else ""
+    quantity = fields[quantity_col] if quantity_col < len(fields) else ""
+    return symbol.strip().upper(), quantity
+
+
+def _record_fields(record):
+    if not isinstance(record, dict):
+        return "", ""
+    keys = {k.strip().lower(): k for k in record}
+    symbol_key = next((keys[k] for k in SYMBOL_FIELDS if k in keys), None)
+    quantity_key = next((keys[k] for k in QUANTITY_FIELDS if k in keys), None)
+    symbol = record.get(symbol_key) if symbol_key else ""
+    quantity = record.get(quantity_key) if quantity_key else ""
+    return str(symbol or "").strip().upper(), quantity
+
+
+def iter_json_rows(file, progress):
+    """Yield (record_number, symbol, quantity) from a JSON array or JSON Lines
+
+    Arrays are decoded one object at a time from a rolling buffer, so the
+    whole document is never held in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    json_decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    number = 0
+    in_array = None
+    eof = False
+    while True:
+        # Skip separators between records
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if in_array is None and position < len(buffer):
+            in_array = buffer[position] == "["
+            if in_array:
+                position += 1
+                continue
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            record, end = json_decoder.raw_decode(buffer, position)
+        except ValueError:
+            if eof:
+                if buffer[position:].strip():
+                    raise ValueError(f"Malformed JSON near record {number + 1}")
+                return
+            chunk = file.read(READ_BYTES)
+            progress(len(chunk))
+            eof = not chunk
+            buffer = buffer[position:] + decoder.decode(chunk, final=eof)
+            position = 0
+            continue
+        position = end
+        number += 1
+        yield number, *_record_fields(record)
+
+
+def import_holdings(path, prices, progress=None, cancel=None, chunk_rows=CHUNK_ROWS):
+    """Stream, validate and aggregate holdings from a CSV or JSON file
+
+    progress(bytes_read, total_bytes, rows_read) is called once per chunk;
+    cancel() is polled at the same points and stops the import when true.
+    """
+    report = ImportReport(path)
+    total_bytes = os.path.getsize(path) or 1
+    bytes_read = 0
+
+    def count(n):
+        nonlocal bytes_read
+        bytes_read += n
+
+    parse = iter_json_rows if path.lower().endswith((".json", ".jsonl", ".ndjson")) else iter_csv_rows
+    totals = report.totals
+    with open(path, "rb") as file:
+        try:
+            for row, symbol, quantity in parse(file, count):
+                report.rows_read += 1
+                # Counted before validation, so a file of bad rows still reports and cancels
+                if report.rows_read % chunk_rows == 0:
+                    if progress:
+                        progress(bytes_read, total_bytes, report.rows_read)
+                    if cancel and cancel():
+                        report.cancelled = True
+                        report.totals = {}
+                        return report
+                try:
+                    symbol, quantity = validate_holding(symbol, quantity, prices)
+                except ValueError as e:
+                    report.add_error(row, str(e))
+                    continue
+                if totals.get(symbol, 0) + quantity > MAX_QUANTITY:
+                    report.add_error(row, f"Total quantity of {symbol} exceeds {MAX_QUANTITY:,}")
+                    continue
+                totals[symbol] = totals.get(symbol, 0) + quantity
+                report.rows_imported += 1
+        except (ValueError, csv.Error) as e:
+            report.fatal = f"Unreadable file: {e}"
+            report.add_error(report.rows_read + 1, report.fatal)
+            report.failed = True
+            report.totals = {}
+    if progress:
+        progress(total_bytes, total_bytes, report.rows_read)
+    return report
+
+
+class ImportWorker:
+    """Runs import_holdings on a worker thread
+
+    Messages arrive on the messages queue as ("progress", fraction, rows)
+    and finally ("done", report) or ("failed", exception).
+    """
+
+    def __init__(self, path, prices):
+        self.path = path
+        self.prices = dict(prices)
+        self.messages = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="portfolio-import", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self):
+        def progress(done, total, rows):
+            self.messages.put(("progress", done / total, rows))
+        try:
+            report = import_holdings(self.path, self.prices, progress, self._cancelled.is_set)
+        except Exception as e:
+            self.messages.put(("failed", e))
+        else:
+            self.messages.put(("done", report))
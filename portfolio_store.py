@@ -0,0 +1,240 @@
+"""Durable portfolio storage: an append-only SQLite journal with snapshots
+
+Every add (with its per-share purchase price) and clear, tagged with the
+account it applies to, is appended to the journal by a background writer
+that commits in batches. Every snapshot_every journal entries the writer
+also stores a full snapshot, so startup only has to load the latest
+snapshot and replay the short journal tail after it. Snapshots list
+every account by name, so accounts that hold nothing survive them too.
+"""
+
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    op TEXT NOT NULL,
+    symbol TEXT,
+    quantity INTEGER,
+    price REAL,
+    account TEXT NOT NULL DEFAULT 'Default'
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    seq INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_holdings (
+    snapshot_seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    cost REAL,
+    purchased TEXT,
+    account TEXT NOT NULL DEFAULT 'Default',
+    PRIMARY KEY (snapshot_seq, position)
+);
+CREATE TABLE IF NOT EXISTS snapshot_accounts (
+    snapshot_seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    PRIMARY KEY (snapshot_seq, position)
+);
+"""
+
+MAX_BATCH = 10000
+RETRY_DELAY = 5.0  # seconds before retrying a batch that failed to commit
+
+_STOP = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn):
+    """Add columns introduced after a database was first created"""
+    for table, column, kind in (("journal", "price", "REAL"),
+                                ("journal", "account", "TEXT NOT NULL DEFAULT 'Default'"),
+                                ("snapshot_holdings", "cost", "REAL"),
+                                ("snapshot_holdings", "purchased", "TEXT"),
+                                ("snapshot_holdings", "account", "TEXT NOT NULL DEFAULT 'Default'")):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+
+def _apply(books, ts, account, op, symbol, quantity, price):
+    """Replay one journal entry into {account: {symbol: [quantity, cost, purchased]}}
+
+    cost is None when any lot was recorded without a purchase price.
+    """
+    holdings = books.setdefault(account, {})
+    if op == "add":
+        holding = holdings.get(symbol)
+        if holding is None:
+            holding = holdings[symbol] = [0, 0.0, ts[:10]]
+        holding[0] += quantity
+        if holding[1] is not None:
+            holding[1] = None if price is None else holding[1] + price * quantity
+    elif op == "clear":
+        holdings.clear()
+
+
+class PortfolioStore:
+    """Journal-backed persistence for a set of named account portfolios
+
+    load() runs on the calling thread; record_*() calls only enqueue, and
+    the writer thread started by start() does all further disk I/O.
+    last_error holds the latest write failure, and is cleared again once
+    the entries it held back have been committed.
+    """
+
+    def __init__(self, path, snapshot_every=5000, batch_delay=0.25):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.batch_delay = batch_delay
+        self.last_error = None
+        self._books = {}
+        self._since_snapshot = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def load(self):
+        """Return {account: {symbol: (quantity, cost, purchased)}} from the
+        latest snapshot plus the journal tail
+
+        cost is the total paid (None if unknown) and purchased the ISO date
+        of the first purchase.
+        """
+        conn = _connect(self.path)
+        try:
+            books = {}
+            row = conn.execute("SELECT MAX(seq) FROM snapshots").fetchone()
+            snapshot_seq = row[0] or 0
+            if snapshot_seq:
+                for (account,) in conn.execute(
+                        "SELECT account FROM snapshot_accounts WHERE snapshot_seq = ? "
+                        "ORDER BY position", (snapshot_seq,)):
+                    books[account] = {}
+                for account, symbol, quantity, cost, purchased in conn.execute(
+                        "SELECT account, symbol, quantity, cost, purchased FROM snapshot_holdings "
+                        "WHERE snapshot_seq = ? ORDER BY position", (snapshot_seq,)):
+                    books.setdefault(account, {})[symbol] = [quantity, cost, purchased or ""]
+            tail = conn.execute("SELECT ts, account, op, symbol, quantity, price FROM journal "
+                                "WHERE seq > ? ORDER BY seq", (snapshot_seq,)).fetchall()
+            for entry in tail:
+                _apply(books, *entry)
+        finally:
+            conn.close()
+        self._books = books
+        self._since_snapshot = len(tail)
+        return {account: {symbol: tuple(h) for symbol, h in holdings.items()}
+                for account, holdings in books.items()}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="portfolio-store", daemon=True)
+            self._thread.start()
+
+    def record_add(self, account, symbol, quantity, price):
+        self._queue.put((account, "add", symbol, quantity, price))
+
+    def record_add_many(self, account, totals, prices):
+        for symbol, quantity in totals.items():
+            self._queue.put((account, "add", symbol, quantity, prices[symbol]))
+
+    def record_open(self, account):
+        self._queue.put((account, "open", None, None, None))
+
+    def record_clear(self, account):
+        self._queue.put((account, "clear", None, None, None))
+
+    def close(self):
+        """Flush pending transactions and stop the writer"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        conn = _connect(self.path)
+        pending = []
+        try:
+            running = True
+            while running:
+                # A failed batch stays pending and is retried with whatever arrives next
+                try:
+                    batch = [self._queue.get(timeout=RETRY_DELAY if pending else None)]
+                except queue.Empty:
+                    batch = []
+                # Give bursts (imports, rapid clicks) a moment to pile up
+                try:
+                    while batch and len(batch) < MAX_BATCH:
+                        batch.append(self._queue.get(timeout=self.batch_delay))
+                except queue.Empty:
+                    pass
+                if _STOP in batch:
+                    running = False
+                    batch = [entry for entry in batch if entry is not _STOP]
+                pending += batch
+                if pending and self._write(conn, pending):
+                    pending = []
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        """Journal a batch; return False, with last_error set, if it was not committed
+
+        The in-memory books only take entries whose commit succeeded, so a
+        snapshot never includes anything the journal does not have.
+        """
+        ts = datetime.now().isoformat(timespec="seconds")
+        try:
+            with conn:
+                conn.executemany("INSERT INTO journal (ts, account, op, symbol, quantity, price) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", [(ts, *entry) for entry in batch])
+        except sqlite3.Error as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        for entry in batch:
+            _apply(self._books, ts, *entry)
+        self._since_snapshot += len(batch)
+        # Snapshot cost grows with the book, so space snapshots out to match
+        size = sum(map(len, self._books.values()))
+        if self._since_snapshot >= max(self.snapshot_every, size):
+            # A failed snapshot loses nothing; the journal tail just gets longer
+            try:
+                with conn:
+                    self._snapshot(conn, ts)
+            except sqlite3.Error as e:
+                self.last_error = e
+            else:
+                self._since_snapshot = 0
+        return True
+
+    def _snapshot(self, conn, ts):
+        seq = conn.execute("SELECT MAX(seq) FROM journal").fetchone()[0]
+        conn.execute("INSERT INTO snapshots (seq, ts) VALUES (?, ?)", (seq, ts))
+        conn.executemany("INSERT INTO snapshot_accounts (snapshot_seq, position, account) "
+                         "VALUES (?, ?, ?)", [(seq, i, account) for i, account in enumerate(self._books)])
+        rows = ((account, symbol, holding)
+                for account, holdings in self._books.items()
+                for symbol, holding in holdings.items())
+        conn.executemany("INSERT INTO snapshot_holdings (snapshot_seq, position, account, symbol, "
+                         "quantity, cost, purchased) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(seq, i, account, symbol, *holding)
+                          for i, (account, symbol, holding) in enumerate(rows)])
+        # Only the newest snapshot is ever loaded
+        conn.execute("DELETE FROM snapshot_holdings WHERE snapshot_seq < ?", (seq,))
+        conn.execute("DELETE FROM snapshot_accounts WHERE snapshot_seq < ?", (seq,))
+        conn.execute("DELETE FROM snapshots WHERE seq < ?", (seq,))
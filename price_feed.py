@@ -0,0 +1,158 @@
+"""Pluggable price sources and a background price feed
+
+The feed runs an asyncio loop on its own thread and hands updates to the
+UI through a thread-safe queue, which the Tk side drains with root.after.
+"""
+
+import asyncio
+import json
+import math
+import queue
+import threading
+from urllib.parse import quote, urlsplit
+
+
+class PriceSource:
+    """Interface for quote providers"""
+
+    async def fetch(self, symbols):
+        """Return {symbol: price} for as many of the symbols as possible"""
+        raise NotImplementedError
+
+
+class HttpPriceSource(PriceSource):
+    """Fetches quotes in bulk from an HTTP endpoint
+
+    Symbols are split into batches of batch_size, each requested as
+    GET <base_url>/quotes?symbols=A,B,C and answered with a JSON object
+    mapping symbol to price. Up to max_concurrency batches are in flight.
+    """
+
+    def __init__(self, base_url, batch_size=250, max_concurrency=8, timeout=5.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.use_ssl = parts.scheme == "https"
+        self.path = parts.path.rstrip("/") + "/quotes"
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    async def fetch(self, symbols):
+        limit = asyncio.Semaphore(self.max_concurrency)
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        results = await asyncio.gather(*(self._fetch_batch(b, limit) for b in batches),
+                                       return_exceptions=True)
+        prices = {}
+        errors = []
+        for result in results:
+            if isinstance(result, Exception):
+                errors.append(result)
+            else:
+                prices.update(result)
+        if errors and not prices:
+            raise errors[0]
+        return prices
+
+    async def _fetch_batch(self, batch, limit):
+        async with limit:
+            return await asyncio.wait_for(self._get(batch), self.timeout)
+
+    async def _get(self, batch):
+        target = f"{self.path}?symbols={quote(','.join(batch), safe=',')}"
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.use_ssl)
+        try:
+            writer.write(f"GET {target} HTTP/1.0\r\nHost: {self.host}\r\n"
+                         "Accept: application/json\r\nConnection: close\r\n\r\n".encode("ascii"))
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        if status_line.split()[1:2] != ["200"]:
+            raise ConnectionError(f"Price feed error: {status_line}")
+        return usable_quotes(json.loads(body))
+
+
+def usable_quotes(quotes):
+    """Keep the finite, positive prices from a decoded {symbol: price} response
+
+    A bad quote (null, "N/A", NaN, 0) is dropped rather than failing its batch.
+    """
+    if not isinstance(quotes, dict):
+        raise ValueError("Price feed did not return a JSON object")
+    prices = {}
+    for symbol, price in quotes.items():
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(price) and price > 0:
+            prices[symbol] = price
+    return prices
+
+
+class PriceFeed:
+    """Polls a PriceSource on a background asyncio loop
+
+    Each successful poll puts a {symbol: price} dict on the updates queue;
+    a failed poll puts the exception instead. The UI thread calls drain().
+    """
+
+    def __init__(self, source, symbols, interval=2.0):
+        self.source = source
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.updates = queue.Queue()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._stopping = False
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=asyncio.run, args=(self._run(),),
+                                            name="price-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                pass  # loop already finished
+        self._thread = None
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        while not self._stopping:
+            try:
+                prices = await self.source.fetch(self.symbols)
+                if prices:
+                    self.updates.put(prices)
+            except Exception as e:
+                self.updates.put(e)
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+        self._loop = None
+
+    def drain(self):
+        """Merge every queued update; return (prices, last_error)"""
+        prices = {}
+        error = None
+        while True:
+            try:
+                item = self.updates.get_nowait()
+            except queue.Empty:
+                return prices, error
+            if isinstance(item, Exception):
+                error = item
+            else:
+                prices.update(item)
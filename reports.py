@@ -0,0 +1,231 @@
+"""Portfolio report rendering shared by Save, Preview and batch runs
+
+Every format is a generator of text chunks produced in a single pass over
+the holdings, so a report can be streamed into a file, a Tk text widget or
+an in-memory buffer without ever being held in memory as a whole.
+
+Amounts are kept in the base currency (INR) by the portfolio and divided
+by one FX rate, a chunk of columns at a time, when a report is rendered
+in another currency.
+"""
+
+import csv
+import html
+import io
+import json
+from datetime import datetime
+
+from fx import BASE_CURRENCY, CURRENCY_NAMES, CURRENCY_SYMBOLS, format_money, format_money_column
+from inr_format import format_words
+
+FORMATS = ("txt", "csv", "json", "html")
+WRITE_BATCH_CHARS = 1 << 16
+CHUNK_ROWS = 4096
+
+
+class ReportData:
+    """Everything a report needs, captured once from a portfolio
+
+    The holdings columns are copied, so a report streamed over many
+    event-loop turns stays consistent while prices tick and holdings
+    change underneath it.
+    """
+
+    def __init__(self, portfolio, generated=None, currency=BASE_CURRENCY, rate=1.0):
+        """rate is base-currency units per unit of the reporting currency"""
+        self.symbols = list(portfolio.symbols)
+        self.quantities = portfolio.quantities.copy()
+        self.prices = portfolio.price_column.copy()
+        self.values = portfolio.values.copy()
+        self.generated = generated or datetime.now()
+        self.currency = currency
+        self.rate = rate
+        self.symbol = CURRENCY_SYMBOLS.get(currency, currency)
+        self.currency_name = CURRENCY_NAMES.get(currency, currency)
+        self.total_value = portfolio.total_value / rate
+        self.stock_count = len(portfolio)
+        self.total_shares = portfolio.total_shares
+        self.largest = portfolio.largest_holding()
+        if self.largest:
+            self.largest = (self.largest[0], self.largest[1] / rate)
+
+    def money(self, amount):
+        return format_money(amount, self.currency)
+
+    def words(self, amount):
+        # Lakh/crore wording only makes sense for rupees
+        return format_words(amount) if self.currency == "INR" else None
+
+    def chunks(self):
+        """Yield (symbols, quantities, prices, values) in the reporting currency"""
+        for start in range(0, len(self.symbols), CHUNK_ROWS):
+            end = start + CHUNK_ROWS
+            symbols, quantities = self.symbols[start:end], self.quantities[start:end]
+            prices, values = self.prices[start:end], self.values[start:end]
+            if self.rate != 1.0:
+                prices, values = prices / self.rate, values / self.rate
+            yield symbols, quantities, prices, values
+
+    def positions(self):
+        for symbols, quantities, prices, values in self.chunks():
+            yield from zip(symbols, quantities.tolist(), prices.tolist(), values.tolist())
+
+    def formatted_rows(self):
+        """Yield (symbol, quantity, price_text, value_text) with columns formatted in bulk"""
+        for symbols, quantities, prices, values in self.chunks():
+            yield from zip(symbols, quantities.tolist(),
+                           format_money_column(prices, self.currency),
+                           format_money_column(values, self.currency))
+
+
+def iter_txt(data):
+    """The original fixed-width TXT report, line by line"""
+    yield "=" * 70 + "\n"
+    yield " " * 20 + f"PORTFOLIO SUMMARY ({data.currency_name})\n"
+    yield "=" * 70 + "\n"
+    yield f"Generated on: {data.generated.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    yield f"Date: {data.generated.strftime('%d-%m-%Y')}\n\n"
+
+    yield "STOCK HOLDINGS:\n"
+    yield "-" * 70 + "\n"
+    price_heading, value_heading = f"Price ({data.symbol})", f"Value ({data.symbol})"
+    yield f"{'Stock':<12} {'Quantity':<12} {price_heading:<15} {value_heading:<20}\n"
+    yield "-" * 70 + "\n"
+
+    for stock, qty, price, value in data.formatted_rows():
+        yield f"{stock:<12} {qty:<12} {price:<15} {value:<20}\n"
+
+    yield "-" * 70 + "\n"
+    yield f"{'TOTAL PORTFOLIO VALUE:':<39} {data.money(data.total_value)}\n"
+
+    words = data.words(data.total_value)
+    if words:
+        yield f"{'IN WORDS:':<39} {words}\n"
+
+    yield "=" * 70 + "\n\n"
+
+    yield "SUMMARY:\n"
+    yield "-" * 70 + "\n"
+    yield f"• Number of different stocks: {data.stock_count}\n"
+    yield f"• Total shares held: {data.total_shares}\n"
+    if data.largest:
+        stock, value = data.largest
+        yield f"• Largest holding: {stock} (Value: {data.money(value)})\n"
+
+    yield "\n" + "=" * 70 + "\n"
+    yield "Note: Prices are for demonstration purposes only\n"
+    yield "=" * 70 + "\n"
+
+
+def iter_csv(data):
+    """One row per holding with raw numeric values"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["Stock", "Quantity", f"Price ({data.currency})", f"Value ({data.currency})"])
+    for stock, qty, price, value in data.positions():
+        writer.writerow([stock, qty, f"{price:.2f}", f"{value:.2f}"])
+        if buffer.tell() >= WRITE_BATCH_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    writer.writerow(["TOTAL", data.total_shares, "", f"{data.total_value:.2f}"])
+    yield buffer.getvalue()
+
+
+def iter_json(data):
+    """A JSON document whose holdings array is emitted row by row"""
+    yield "{\n"
+    yield f'  "generated": {json.dumps(data.generated.isoformat(timespec="seconds"))},\n'
+    yield f'  "currency": {json.dumps(data.currency)},\n'
+    yield '  "holdings": ['
+    separator = "\n    "
+    for stock, qty, price, value in data.positions():
+        yield separator + json.dumps({"stock": stock, "quantity": qty,
+                                      "price": round(price, 2), "value": round(value, 2)})
+        separator = ",\n    "
+    yield "\n  ],\n"
+    largest = None
+    if data.largest:
+        largest = {"stock": data.largest[0], "value": round(data.largest[1], 2)}
+    summary = {"total_value": round(data.total_value, 2), "stock_count": data.stock_count,
+               "total_shares": data.total_shares, "largest_holding": largest}
+    yield f'  "summary": {json.dumps(summary)}\n'
+    yield "}\n"
+
+
+def iter_html(data):
+    """A standalone HTML page with the holdings table"""
+    yield ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+           "<title>Portfolio Summary</title></head><body>\n")
+    yield f"<h1>Portfolio Summary ({html.escape(data.currency_name.title())})</h1>\n"
+    yield f"<p>Generated on: {data.generated.strftime('%Y-%m-%d %H:%M:%S')}</p>\n"
+    yield ("<table border=\"1\" cellspacing=\"0\" cellpadding=\"4\">\n"
+           f"<tr><th>Stock</th><th>Quantity</th><th>Price ({data.symbol})</th>"
+           f"<th>Value ({data.symbol})</th></tr>\n")
+    for stock, qty, price, value in data.formatted_rows():
+        yield (f"<tr><td>{html.escape(stock)}</td><td>{qty}</td>"
+               f"<td>{price}</td><td>{value}</td></tr>\n")
+    yield f"<tr><th colspan=\"3\">Total Portfolio Value</th><th>{data.money(data.total_value)}</th></tr>\n"
+    yield "</table>\n"
+    words = data.words(data.total_value)
+    if words:
+        yield f"<p>In words: {words}</p>\n"
+    yield (f"<p>Number of different stocks: {data.stock_count}<br>"
+           f"Total shares held: {data.total_shares}</p>\n")
+    yield "</body></html>\n"
+
+
+_RENDERERS = {"txt": iter_txt, "csv": iter_csv, "json": iter_json, "html": iter_html}
+
+
+def render(data, fmt="txt"):
+    """Return a chunk iterator for the report in the given format"""
+    return _RENDERERS[fmt](data)
+
+
+def batched(chunks, size=WRITE_BATCH_CHARS):
+    """Merge small chunks into strings of roughly size characters"""
+    pending = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(pending)
+            pending = []
+            length = 0
+    if pending:
+        yield "".join(pending)
+
+
+def write_report(chunks, write):
+    """Stream chunks into any write(str) callable (file, StringIO, ...)"""
+    for batch in batched(chunks):
+        write(batch)
+
+
+def stream_to_widget(widget, chunks, on_done=None):
+    """Insert chunks into a Tk text widget one batch per event-loop turn
+
+    Returns a function that stops the stream (on_done is then not called).
+    """
+    batches = batched(chunks)
+    stopped = False
+
+    def step():
+        if stopped or not widget.winfo_exists():
+            return
+        batch = next(batches, None)
+        if batch is None:
+            if on_done:
+                on_done()
+            return
+        widget.insert("end", batch)
+        widget.after(1, step)
+
+    def stop():
+        nonlocal stopped
+        stopped = True
+
+    step()
+    return stop
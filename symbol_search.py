@@ -0,0 +1,189 @@
+"""Ranked search over stock symbols and company names
+
+Matches are ranked by kind (exact symbol, symbol prefix, company-name word
+prefix, then substring) and within a kind by shorter symbol first.
+SymbolIndex numbers the entries in that tie-break order, so every posting
+list below is already ranked and a query with a limit stops after the
+first few hits instead of sorting everything that matched:
+
+* postings for every 1..PREFIX_LEN character prefix of the symbols and of
+  each company-name word;
+* sorted token lists, bisected for longer prefixes;
+* trigram postings for matches in the middle of a word.
+"""
+
+import threading
+from bisect import bisect_left
+from itertools import islice
+
+# Match kinds, best first
+EXACT, SYMBOL_PREFIX, NAME_PREFIX, SUBSTRING = range(4)
+PREFIX_LEN = 3
+RANGE_SORT = 256  # longer prefixes with fewer token hits than this are just sorted
+
+
+def _words(text):
+    return text.lower().replace(".", " ").replace("-", " ").split()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _rank_key(symbol):
+    return (len(symbol), symbol)
+
+
+def _rank(query, symbol, name):
+    """Return the match kind for a lower-case query, or None if it does not match"""
+    lowered = symbol.lower()
+    if lowered == query:
+        return EXACT
+    if lowered.startswith(query):
+        return SYMBOL_PREFIX
+    if any(word.startswith(query) for word in _words(name)):
+        return NAME_PREFIX
+    if len(query) >= 3 and query in f"{lowered} {name.lower()}":
+        return SUBSTRING
+    return None
+
+
+def scan(entries, query, limit=None):
+    """Linear search over {symbol: name}; used until the index is ready"""
+    query = query.strip().lower()
+    ranked = []
+    for symbol, name in entries.items():
+        kind = _rank(query, symbol, name or "") if query else EXACT
+        if kind is not None:
+            ranked.append((kind, _rank_key(symbol)))
+    ranked.sort()
+    return [symbol for _, (_, symbol) in islice(ranked, limit)]
+
+
+class SymbolIndex:
+    """Prefix and trigram index over {symbol: company name}"""
+
+    def __init__(self, entries):
+        self.symbols = sorted(entries, key=_rank_key)
+        self.texts = []
+        self.words = []
+        self.exact = {}
+        self.symbol_prefixes = {}
+        self.name_prefixes = {}
+        self.trigrams = {}
+        symbol_tokens = []
+        name_tokens = []
+        for i, symbol in enumerate(self.symbols):
+            name = entries[symbol] or ""
+            lowered = symbol.lower()
+            words = _words(name)
+            self.exact[lowered] = i
+            self.words.append(words)
+            symbol_tokens.append((lowered, i))
+            self._add_prefixes(self.symbol_prefixes, lowered, i)
+            for word in words:
+                name_tokens.append((word, i))
+                self._add_prefixes(self.name_prefixes, word, i)
+            text = f"{lowered} {name.lower()}"
+            self.texts.append(text)
+            for trigram in _trigrams(text):
+                self.trigrams.setdefault(trigram, []).append(i)
+        symbol_tokens.sort()
+        name_tokens.sort()
+        self.symbol_tokens = [token for token, _ in symbol_tokens]
+        self.symbol_token_ids = [i for _, i in symbol_tokens]
+        self.name_tokens = [token for token, _ in name_tokens]
+        self.name_token_ids = [i for _, i in name_tokens]
+
+    @staticmethod
+    def _add_prefixes(prefixes, token, i):
+        for n in range(1, min(len(token), PREFIX_LEN) + 1):
+            posting = prefixes.setdefault(token[:n], [])
+            # Entries are added in rank order; a name can repeat a prefix
+            if not posting or posting[-1] != i:
+                posting.append(i)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _prefix_ids(self, query, prefixes, tokens, token_ids, matches, limit):
+        """Yield ids with a token starting with query, in rank order"""
+        if len(query) <= PREFIX_LEN:
+            yield from prefixes.get(query, ())
+            return
+        lo = bisect_left(tokens, query)
+        hi = lo
+        while hi < len(tokens) and tokens[hi].startswith(query) and hi - lo <= RANGE_SORT:
+            hi += 1
+        if limit is None or hi - lo <= RANGE_SORT:
+            if hi - lo > RANGE_SORT:
+                hi = bisect_left(tokens, query + "\uffff", lo)
+            yield from sorted(set(token_ids[lo:hi]))
+            return
+        # Many hits: walk the short-prefix posting, which is already ranked
+        for i in prefixes.get(query[:PREFIX_LEN], ()):
+            if matches(i):
+                yield i
+
+    def search(self, query, limit=None):
+        """Return symbols matching query, best matches first"""
+        query = query.strip().lower()
+        if not query:
+            return self.symbols[:limit]
+
+        found = []
+        seen = set()
+
+        def take(ids):
+            for i in ids:
+                if limit is not None and len(found) >= limit:
+                    return
+                if i not in seen:
+                    seen.add(i)
+                    found.append(i)
+
+        if query in self.exact:
+            take([self.exact[query]])
+        take(self._prefix_ids(query, self.symbol_prefixes, self.symbol_tokens,
+                              self.symbol_token_ids,
+                              lambda i: self.symbols[i].lower().startswith(query), limit))
+        take(self._prefix_ids(query, self.name_prefixes, self.name_tokens,
+                              self.name_token_ids,
+                              lambda i: any(w.startswith(query) for w in self.words[i]), limit))
+        if len(query) >= 3:
+            # Every id containing query is in each of its trigram postings; scan the shortest
+            postings = [self.trigrams.get(trigram, ()) for trigram in _trigrams(query)]
+            take(i for i in min(postings, key=len) if query in self.texts[i])
+        return [self.symbols[i] for i in found]
+
+
+class SymbolSearch:
+    """Builds a SymbolIndex on a background thread and searches it
+
+    Until the build finishes, search() falls back to a linear scan, so the
+    UI never waits for the index.
+    """
+
+    def __init__(self, entries):
+        self.entries = dict(entries)
+        self.index = None
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._build, name="symbol-index", daemon=True)
+            self._thread.start()
+
+    def _build(self):
+        self.index = SymbolIndex(self.entries)
+
+    def search(self, query, limit=None):
+        self.start()
+        index = self.index
+        if index is None:
+            return scan(self.entries, query, limit)
+        return index.search(query, limit)
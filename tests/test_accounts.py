@@ -0,0 +1,49 @@
+import pytest
+
+from accounts import AccountBook
+
+PRICES = {"TCS": 100.0, "INFY": 50.0, "ITC": 5.0}
+
+
+def make_book():
+    book = AccountBook(dict(PRICES))
+    book.add("A", "TCS", 2, cost=150.0)
+    book.add_many("B", ["TCS", "INFY"], [1, 4])
+    book.open("Empty")
+    return book
+
+
+def test_holders_and_firm_totals():
+    book = make_book()
+    assert book.names() == ["A", "B", "Empty"]
+    assert book.holders == {"TCS": {"A", "B"}, "INFY": {"B"}}
+    assert book.firm_total == 500.0
+    assert book.firm_cost == 450.0
+    assert book.account_totals() == {"A": 200.0, "B": 300.0, "Empty": 0.0}
+
+
+def test_price_update_reaches_only_holders():
+    book = make_book()
+    changed = book.update_prices({"INFY": 60.0, "ITC": 6.0})
+    assert changed == {"B": ["INFY"]}
+    assert book.firm_total == pytest.approx(540.0)
+    assert book.firm_total == pytest.approx(sum(book.account_totals().values()))
+    assert book.prices["ITC"] == 6.0
+
+
+def test_clear_drops_holders_and_totals():
+    book = make_book()
+    book.clear("B")
+    book.clear("Missing")
+    assert book.holders == {"TCS": {"A"}}
+    assert book.firm_total == 200.0
+    assert book.firm_cost == 150.0
+    assert not book.get("B")
+    assert book.update_prices({"INFY": 70.0}) == {}
+
+
+def test_aggregate_combines_accounts():
+    combined = make_book().aggregate()
+    assert {symbol: (quantity, value) for symbol, quantity, _, value in combined.positions()} == {
+        "TCS": (3, 300.0), "INFY": (4, 200.0)}
+    assert combined.total_cost == 450.0
@@ -0,0 +1,87 @@
+import pytest
+
+from analytics import PnLAnalytics
+from portfolio_core import Portfolio
+from timeseries import PriceHistory
+
+DAY = 86400
+
+
+def tick(portfolio, analytics, day, prices):
+    portfolio.update_prices(prices)
+    analytics.on_prices(prices, day * DAY + 1)
+
+
+def test_adding_shares_is_not_a_return():
+    portfolio = Portfolio({"TCS": 100.0})
+    portfolio.add("TCS", 10)
+    analytics = PnLAnalytics(portfolio, PriceHistory())
+    for day in range(5):
+        if day == 2:
+            portfolio.add("TCS", 1000)
+        tick(portfolio, analytics, day, {"TCS": 100.0})
+    summary = analytics.summary()
+    assert summary["volatility"] == 0.0
+    assert summary["max_drawdown"] == 0.0
+
+
+def test_clearing_is_not_a_drawdown():
+    portfolio = Portfolio({"TCS": 100.0})
+    portfolio.add("TCS", 10)
+    analytics = PnLAnalytics(portfolio, PriceHistory())
+    for day in range(4):
+        if day == 2:
+            portfolio.clear()
+        tick(portfolio, analytics, day, {"TCS": 100.0})
+    assert analytics.summary()["max_drawdown"] == 0.0
+
+
+CLOSES = [(100.0, 50.0), (110.0, 45.0), (99.0, 47.0), (120.0, 40.0), (120.0, 52.0)]
+
+
+def test_live_statistics_match_rebuild():
+    portfolio = Portfolio({"A": 100.0, "B": 50.0})
+    portfolio.add_many(["A", "B"], [3, 7])
+    analytics = PnLAnalytics(portfolio, PriceHistory())
+    for day, (a, b) in enumerate(CLOSES):
+        tick(portfolio, analytics, day, {"A": a, "B": b})
+    rebuilt = PnLAnalytics(portfolio, analytics.history)
+    rebuilt.rebuild()
+    # The next day's first tick closes the last bar of the live series
+    tick(portfolio, analytics, len(CLOSES), dict(zip("AB", CLOSES[-1])))
+    assert analytics.stats.count == rebuilt.stats.count == len(CLOSES) - 1
+    assert analytics.stats.mean == pytest.approx(rebuilt.stats.mean)
+    assert analytics.stats.volatility == pytest.approx(rebuilt.stats.volatility)
+    assert analytics.stats.max_drawdown == pytest.approx(rebuilt.stats.max_drawdown)
+
+
+def test_returns_use_the_holdings_of_each_bar():
+    portfolio = Portfolio({"A": 100.0, "B": 50.0})
+    portfolio.add_many(["A", "B"], [1, 4])
+    analytics = PnLAnalytics(portfolio, PriceHistory())
+    holdings = []
+    for day, (a, b) in enumerate(CLOSES + [CLOSES[-1]]):
+        tick(portfolio, analytics, day, {"A": a, "B": b})
+        if day == 1:
+            portfolio.add("A", 50)
+            portfolio.add_many(["B"], [10])
+        holdings.append((portfolio.quantity("A"), portfolio.quantity("B")))
+    returns = [(qa * a1 + qb * b1) / (qa * a0 + qb * b0) - 1
+               for (qa, qb), (a0, b0), (a1, b1) in zip(holdings, CLOSES, CLOSES[1:])]
+    assert analytics.stats.count == len(returns)
+    assert analytics.stats.mean == pytest.approx(sum(returns) / len(returns))
+
+
+def test_bar_return_spans_a_mid_bar_add():
+    portfolio = Portfolio({"A": 100.0})
+    portfolio.add("A", 1)
+    analytics = PnLAnalytics(portfolio, PriceHistory())
+    tick(portfolio, analytics, 0, {"A": 100.0})
+    tick(portfolio, analytics, 1, {"A": 100.0})
+    tick(portfolio, analytics, 1.25, {"A": 110.0})
+    portfolio.add("A", 99)
+    tick(portfolio, analytics, 1.5, {"A": 121.0})
+    tick(portfolio, analytics, 2, {"A": 121.0})
+    # 100 -> 110 -> 121 is +21% whatever was added along the way
+    assert analytics.stats.count == 1
+    assert analytics.stats.mean == pytest.approx(0.21)
@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from fx import FxCache, NativePrices, format_money, format_money_total
+from portfolio_core import Portfolio
+
+
+def make_cache():
+    return FxCache(max_age=60, defaults={"USD": 80.0, "EUR": 90.0})
+
+
+@pytest.mark.parametrize("rate", [math.nan, math.inf, -math.inf, 0.0, -1.0])
+def test_update_ignores_unusable_rates(rate):
+    fx = make_cache()
+    assert fx.update({"USD": rate}, timestamp=0) == []
+    assert fx.rate("USD", now=0) == 80.0
+
+
+def test_live_rates_expire_to_defaults():
+    fx = make_cache()
+    assert fx.update({"USD": 83.0, "EUR": 90.0, "INR": 2.0}, timestamp=100) == ["USD"]
+    assert fx.rate("USD", now=150) == 83.0
+    assert fx.cross("EUR", "USD", now=150) == pytest.approx(90.0 / 83.0)
+    assert fx.evict_stale(now=200) == ["USD"]
+    assert fx.rate("USD", now=200) == 80.0
+    assert fx.rate("INR") == 1.0
+    with pytest.raises(KeyError):
+        fx.rate("JPY")
+
+
+def test_only_the_moved_bucket_is_repriced():
+    fx = make_cache()
+    pricing = NativePrices({"AAPL": 10.0, "TCS": 100.0}, {"AAPL": "USD"}, fx)
+    assert pricing.base_prices == {"AAPL": 800.0, "TCS": 100.0}
+    fx.update({"USD": 85.0})
+    assert pricing.rebase("USD") == {"AAPL": 850.0}
+    assert pricing.update_quotes({"AAPL": 11.0, "NEW": 5.0}) == {"AAPL": 935.0, "NEW": 5.0}
+    assert pricing.currency("NEW") == "INR"
+
+
+def test_bucket_values_split_by_currency():
+    fx = make_cache()
+    pricing = NativePrices({"AAPL": 10.0, "TCS": 100.0}, {"AAPL": "USD"}, fx)
+    portfolio = Portfolio(dict(pricing.base_prices))
+    assert pricing.bucket_values(portfolio) == {}
+    portfolio.add_many(["AAPL", "TCS"], [2, 3])
+    assert pricing.bucket_values(portfolio) == {"USD": 20.0, "INR": 300.0}
+
+
+def test_format_money():
+    assert format_money(1234567.5, "USD") == "$1,234,567.50"
+    assert format_money(-0.001, "EUR") == "€0.00"
+    assert format_money(1234567.5) == "₹12,34,567.50"
+    assert format_money_total(0.0, "GBP") == "£0.00"
+    assert format_money(5.0, "JPY") == "JPY 5.00"
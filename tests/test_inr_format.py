@@ -0,0 +1,35 @@
+import pytest
+
+from inr_format import format_inr, format_total, format_words, group_indian
+
+
+@pytest.mark.parametrize("digits, expected", [
+    ("0", "0"),
+    ("999", "999"),
+    ("1000", "1,000"),
+    ("12345", "12,345"),
+    ("123456", "1,23,456"),
+    ("1234567", "12,34,567"),
+    ("12345678", "1,23,45,678"),
+    ("123456789012", "1,23,45,67,89,012"),
+])
+def test_group_indian(digits, expected):
+    assert group_indian(digits) == expected
+
+
+@pytest.mark.parametrize("amount, expected", [
+    (0, "₹0.00"),
+    (1234567.891, "₹12,34,567.89"),
+    (-1234567.891, "-₹12,34,567.89"),
+    (-0.001, "₹0.00"),
+    (99999.996, "₹1,00,000.00"),
+])
+def test_format_inr(amount, expected):
+    assert format_inr(amount) == expected
+
+
+def test_words_start_at_one_lakh():
+    assert format_words(99999.99) is None
+    assert format_words(100000) == "₹1.00 Lakhs"
+    assert format_words(25000000) == "₹2.50 Crores"
+    assert format_total(2500000) == "₹25,00,000.00 (₹25.00 Lakhs)"
@@ -0,0 +1,64 @@
+import argparse
+
+import pytest
+
+import portfolio_import
+from portfolio_cli import _parse_rate, collect_files, load_prices, run_batch
+
+
+@pytest.fixture
+def clients(tmp_path):
+    (tmp_path / "prices.csv").write_text("symbol,price,currency\nTCS,100,\nAAPL,2,USD\n")
+    for name, text in (("a/x.csv", "symbol,qty\nTCS,1\n"),
+                       ("a/x.json", '[{"symbol": "AAPL", "qty": 3}]'),
+                       ("b/x.csv", "symbol,qty\nTCS,2\nAAPL,1\n")):
+        path = tmp_path / "clients" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def test_reports_keep_relative_paths(clients):
+    files = collect_files([str(clients / "clients")])
+    results = run_batch(files, str(clients / "prices.csv"), str(clients / "out"),
+                        rates={"USD": 80.0}, workers=1)
+    assert [r.get("error") for r in results] == [None] * 3
+    assert [r["total_value"] for r in results] == [100.0, 480.0, 360.0]
+    written = sorted(p.relative_to(clients / "out").as_posix() for p in (clients / "out").rglob("*.txt"))
+    assert written == ["a/x.csv.txt", "a/x.json.txt", "b/x.csv.txt"]
+
+
+def test_colliding_outputs_fail_before_writing(clients):
+    files = collect_files([str(clients / "clients" / "a" / "x.csv"), str(clients / "clients" / "b" / "x.csv")])
+    with pytest.raises(ValueError, match="both be written"):
+        run_batch(files, str(clients / "prices.csv"), str(clients / "out"), workers=1)
+    assert not (clients / "out").exists()
+
+
+def test_unreadable_file_is_a_failure(clients):
+    (clients / "clients" / "a" / "x.json").write_text('[{"symbol": "AAPL", "qty": 3}, {"sym')
+    files = collect_files([str(clients / "clients" / "a")])
+    results = run_batch(files, str(clients / "prices.csv"), str(clients / "out"), workers=1)
+    assert "Unreadable file" in results[1]["error"]
+
+
+def test_unreadable_file_after_many_rejected_rows(clients, monkeypatch):
+    monkeypatch.setattr(portfolio_import, "MAX_REPORTED_ERRORS", 2)
+    (clients / "clients" / "a" / "x.json").write_text('[' + '{"symbol": "NOPE", "qty": 1}, ' * 5 + '{"sym')
+    files = collect_files([str(clients / "clients" / "a")])
+    results = run_batch(files, str(clients / "prices.csv"), str(clients / "out"), workers=1)
+    assert results[1]["error"].startswith("Unreadable file")
+
+
+@pytest.mark.parametrize("text", ['{"TCS": [1]}', '{"TCS": {"price": "n/a"}}', '[{"symbol": "TCS", "price": {}}]'])
+def test_bad_json_prices_name_the_symbol(tmp_path, text):
+    path = tmp_path / "prices.json"
+    path.write_text(text)
+    with pytest.raises(ValueError, match="bad price for TCS"):
+        load_prices(str(path))
+
+
+@pytest.mark.parametrize("text", ["USD=0", "USD=-83", "USD=nan", "USD"])
+def test_bad_rates_are_rejected(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        _parse_rate(text)
@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from portfolio_core import MAX_QUANTITY, Portfolio, validate_holding
+from portfolio_import import import_holdings
+
+PRICES = {"TCS": 100.0, "INFY": 50.0}
+
+
+@pytest.mark.parametrize("stock, quantity, message", [
+    ("Select Stock", "1", "select a stock"),
+    ("NOPE", "1", "Unknown stock"),
+    ("TCS", "1.5", "whole number"),
+    ("TCS", "0", "greater than 0"),
+    ("TCS", "99999999999999999999", "at most"),
+    ("TCS", str(MAX_QUANTITY + 1), "at most"),
+])
+def test_validate_holding_rejects(stock, quantity, message):
+    with pytest.raises(ValueError, match=message):
+        validate_holding(stock, quantity, PRICES)
+
+
+def test_validate_holding_accepts_the_limit():
+    assert validate_holding(" TCS ", f" {MAX_QUANTITY} ", PRICES) == ("TCS", MAX_QUANTITY)
+
+
+def test_add_keeps_running_totals():
+    portfolio = Portfolio(dict(PRICES))
+    portfolio.add("TCS", 3)
+    portfolio.add("INFY", 2, cost=90.0, purchased=date(2024, 1, 2))
+    portfolio.add("TCS", 1)
+    assert portfolio.symbols == ["TCS", "INFY"]
+    assert portfolio.quantity("TCS") == 4
+    assert portfolio.total_value == 500.0
+    assert portfolio.total_cost == 490.0
+    assert portfolio.purchase_date("INFY") == date(2024, 1, 2)
+
+
+def test_oversized_add_changes_nothing():
+    portfolio = Portfolio(dict(PRICES))
+    with pytest.raises(ValueError):
+        portfolio.add("TCS", 99999999999999999999)
+    portfolio.add("INFY", MAX_QUANTITY)
+    with pytest.raises(ValueError):
+        portfolio.add("INFY", 1)
+    assert portfolio.symbols == ["INFY"]
+    assert portfolio.quantity("INFY") == MAX_QUANTITY
+    assert portfolio.total_value == MAX_QUANTITY * 50.0
+
+
+def test_add_many_sums_quantities_exactly():
+    portfolio = Portfolio(dict(PRICES))
+    portfolio.add("TCS", 1)
+    portfolio.add_many(["INFY", "TCS", "INFY"], [MAX_QUANTITY - 7, MAX_QUANTITY - 2, 7])
+    assert portfolio.quantity("TCS") == MAX_QUANTITY - 1
+    assert portfolio.quantity("INFY") == MAX_QUANTITY
+    assert portfolio.total_shares == 2 * MAX_QUANTITY - 1
+
+
+@pytest.mark.parametrize("symbols, quantities", [
+    (["INFY", "TCS"], [1, 99999999999999999999]),
+    (["INFY", "TCS", "TCS"], [1, MAX_QUANTITY, 1]),
+    (["INFY", "TCS"], [1, -5]),
+    (["INFY", "NOPE"], [1, 1]),
+])
+def test_add_many_failure_creates_no_rows(symbols, quantities):
+    portfolio = Portfolio(dict(PRICES))
+    with pytest.raises((ValueError, KeyError)):
+        portfolio.add_many(symbols, quantities)
+    assert not portfolio
+    assert portfolio.index == {}
+    assert portfolio.total_value == 0.0
+
+
+def test_update_prices_and_clear():
+    portfolio = Portfolio(dict(PRICES))
+    portfolio.add_many(["TCS", "INFY"], [2, 4])
+    assert portfolio.update_prices({"TCS": 110.0, "WIPRO": 5.0}) == ["TCS"]
+    assert portfolio.total_value == pytest.approx(420.0)
+    assert portfolio.largest_holding() == ("TCS", 220.0)
+    assert portfolio.net_flow == 400.0
+    portfolio.clear()
+    assert not portfolio
+    assert portfolio.net_flow == pytest.approx(-20.0)
+
+
+def test_import_rejects_oversized_quantities(tmp_path):
+    path = tmp_path / "holdings.csv"
+    path.write_text(f"symbol,qty\nTCS,99999999999999999999\nINFY,{MAX_QUANTITY}\nINFY,1\nTCS,5\n")
+    report = import_holdings(str(path), PRICES)
+    assert report.totals == {"INFY": MAX_QUANTITY, "TCS": 5}
+    assert [row for row, _ in report.errors] == [2, 4]
@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+import portfolio_import
+from portfolio_import import import_holdings, iter_json_rows
+
+RECORDS = [
+    {"symbol": "tcs", "qty": 5},
+    {"Ticker": "INFY", "Shares": "12", "note": "a [tricky], {string}"},
+    {"stock": "WIPRO", "quantity": 3, "name": "Wipro — ₹ रुपया"},
+]
+EXPECTED = [(1, "TCS", 5), (2, "INFY", "12"), (3, "WIPRO", 3)]
+
+
+def read_all(data):
+    consumed = []
+    rows = list(iter_json_rows(io.BytesIO(data), consumed.append))
+    return rows, sum(consumed)
+
+
+@pytest.mark.parametrize("read_bytes", [1, 2, 3, 7, 64, 1 << 16])
+def test_json_array_across_chunk_boundaries(monkeypatch, read_bytes):
+    monkeypatch.setattr(portfolio_import, "READ_BYTES", read_bytes)
+    data = json.dumps(RECORDS, ensure_ascii=False, indent=2).encode("utf-8")
+    rows, consumed = read_all(b"\xef\xbb\xbf" + data)
+    assert rows == EXPECTED
+    assert consumed == len(data) + 3
+
+
+@pytest.mark.parametrize("read_bytes", [1, 5, 1 << 16])
+def test_json_lines_across_chunk_boundaries(monkeypatch, read_bytes):
+    monkeypatch.setattr(portfolio_import, "READ_BYTES", read_bytes)
+    data = "\n".join(json.dumps(r, ensure_ascii=False) for r in RECORDS).encode("utf-8")
+    assert read_all(data)[0] == EXPECTED
+
+
+def test_empty_array():
+    assert read_all(b"  [ ]  ")[0] == []
+
+
+def test_malformed_json_raises(monkeypatch):
+    monkeypatch.setattr(portfolio_import, "READ_BYTES", 4)
+    data = b'[{"symbol": "TCS", "qty": 5}, {"symbol": "IN'
+    with pytest.raises(ValueError, match="record 2"):
+        read_all(data)
+
+
+def test_truncated_file_adds_nothing(tmp_path):
+    path = tmp_path / "holdings.json"
+    path.write_text('[{"symbol": "TCS", "qty": 5}, {"symbol": "INFY", "qty": 2}, {"sym')
+    report = import_holdings(str(path), {"TCS": 1.0, "INFY": 1.0})
+    assert report.failed
+    assert report.totals == {}
+    assert "nothing was added" in report.summary()
+
+
+def test_csv_rows_are_validated_and_aggregated(tmp_path):
+    path = tmp_path / "holdings.csv"
+    path.write_text("Symbol,Qty\nTCS,5\ntcs,2\nNOPE,1\nINFY,-3\n")
+    report = import_holdings(str(path), {"TCS": 1.0, "INFY": 1.0})
+    assert not report.failed
+    assert report.totals == {"TCS": 7}
+    assert report.rows_read == 4
+    assert report.error_count == 2
+
+
+def test_progress_and_cancel_count_rejected_rows(tmp_path):
+    path = tmp_path / "holdings.csv"
+    path.write_text("symbol,qty\n" + "NOPE,1\n" * 10 + "TCS,1\n")
+    polls = []
+    report = import_holdings(str(path), {"TCS": 1.0}, progress=lambda *args: polls.append(args[2]),
+                             cancel=lambda: len(polls) == 2, chunk_rows=3)
+    assert polls == [3, 6]
+    assert report.cancelled
+    assert report.totals == {}
+
+
+def test_worker_reports_unexpected_errors(tmp_path):
+    path = tmp_path / "holdings.json"
+    path.write_text("[" * 100_000 + "]" * 100_000)
+    worker = portfolio_import.ImportWorker(str(path), {"TCS": 1.0})
+    worker._run()
+    messages = []
+    while not worker.messages.empty():
+        messages.append(worker.messages.get_nowait())
+    assert messages[-1][0] == "failed"
+    assert isinstance(messages[-1][1], RecursionError)
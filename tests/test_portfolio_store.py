@@ -0,0 +1,155 @@
+import sqlite3
+import time
+
+import pytest
+
+import portfolio_store
+from portfolio_store import PortfolioStore
+
+TODAY = "2026-01-02"
+
+
+def write(path, entries, snapshot_every=5000):
+    store = PortfolioStore(str(path), snapshot_every=snapshot_every, batch_delay=0.01)
+    store.load()
+    store.start()
+    for method, *args in entries:
+        getattr(store, method)(*args)
+    store.close()
+    assert store.last_error is None
+
+
+def strip_dates(books):
+    return {account: {symbol: (quantity, cost) for symbol, (quantity, cost, _) in holdings.items()}
+            for account, holdings in books.items()}
+
+
+ENTRIES = [
+    ("record_add", "Default", "TCS", 5, 100.0),
+    ("record_add", "Default", "TCS", 5, 120.0),
+    ("record_open", "Empty"),
+    ("record_add_many", "Client", {"INFY": 10, "ITC": 4}, {"INFY": 50.0, "ITC": 2.5}),
+    ("record_add", "Cleared", "SBIN", 1, 600.0),
+    ("record_clear", "Cleared"),
+]
+EXPECTED = {
+    "Default": {"TCS": (10, 1100.0)},
+    "Empty": {},
+    "Client": {"INFY": (10, 500.0), "ITC": (4, 10.0)},
+    "Cleared": {},
+}
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 3, 5000])
+def test_round_trip_keeps_every_account(tmp_path, snapshot_every):
+    path = tmp_path / "portfolio.db"
+    write(path, ENTRIES, snapshot_every)
+    books = PortfolioStore(str(path)).load()
+    assert strip_dates(books) == EXPECTED
+    assert list(books) == list(EXPECTED)
+
+
+def test_snapshot_plus_journal_tail(tmp_path):
+    path = tmp_path / "portfolio.db"
+    write(path, ENTRIES, snapshot_every=1)
+    write(path, [("record_add", "Empty", "WIPRO", 2, 500.0), ("record_clear", "Default")])
+    with sqlite3.connect(path) as conn:
+        snapshot_seq = conn.execute("SELECT MAX(seq) FROM snapshots").fetchone()[0]
+        tail = conn.execute("SELECT COUNT(*) FROM journal WHERE seq > ?", (snapshot_seq,)).fetchone()[0]
+    assert tail == 2
+    books = strip_dates(PortfolioStore(str(path)).load())
+    assert books == {**EXPECTED, "Default": {}, "Empty": {"WIPRO": (2, 1000.0)}}
+
+
+def test_old_database_is_migrated(tmp_path):
+    path = tmp_path / "portfolio.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT NOT NULL,
+                                  op TEXT NOT NULL, symbol TEXT, quantity INTEGER);
+            CREATE TABLE snapshots (seq INTEGER PRIMARY KEY, ts TEXT NOT NULL);
+            CREATE TABLE snapshot_holdings (snapshot_seq INTEGER NOT NULL, position INTEGER NOT NULL,
+                                            symbol TEXT NOT NULL, quantity INTEGER NOT NULL,
+                                            PRIMARY KEY (snapshot_seq, position));
+        """)
+        conn.execute("INSERT INTO journal (ts, op, symbol, quantity) VALUES (?, 'add', 'TCS', 3)",
+                     (TODAY,))
+        conn.execute("INSERT INTO snapshots VALUES (1, ?)", (TODAY,))
+        conn.execute("INSERT INTO snapshot_holdings VALUES (1, 0, 'TCS', 3)")
+        conn.execute("INSERT INTO journal (ts, op, symbol, quantity) VALUES (?, 'add', 'INFY', 2)",
+                     (TODAY,))
+    books = PortfolioStore(str(path)).load()
+    # Lots recorded without a purchase price have an unknown cost
+    assert books == {"Default": {"TCS": (3, None, ""), "INFY": (2, None, TODAY)}}
+
+
+def fail_inserts(path, table):
+    """Make inserts into table abort while the fail table has a row"""
+    with sqlite3.connect(path) as conn:
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS fail (x);
+            CREATE TRIGGER fail_{table} BEFORE INSERT ON {table}
+            WHEN EXISTS (SELECT 1 FROM fail) BEGIN SELECT RAISE(ABORT, '{table} unavailable'); END;
+            INSERT INTO fail VALUES (1);
+        """)
+
+
+def recover(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM fail")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_failed_batch_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(portfolio_store, "RETRY_DELAY", 0.01)
+    path = tmp_path / "portfolio.db"
+    store = PortfolioStore(str(path), batch_delay=0.01)
+    store.load()
+    fail_inserts(path, "journal")
+    store.start()
+    store.record_add("Default", "TCS", 5, 100.0)
+    wait_for(lambda: store.last_error is not None)
+    assert "journal unavailable" in str(store.last_error)
+    assert store._books == {}
+    recover(path)
+    wait_for(lambda: store.last_error is None)
+    store.record_add("Default", "TCS", 1, 130.0)
+    store.close()
+    assert strip_dates(PortfolioStore(str(path)).load()) == {"Default": {"TCS": (6, 630.0)}}
+
+
+def test_unsaved_batch_is_reported_on_close(tmp_path):
+    path = tmp_path / "portfolio.db"
+    store = PortfolioStore(str(path), batch_delay=0.01)
+    store.load()
+    fail_inserts(path, "journal")
+    store.start()
+    store.record_add("Default", "TCS", 5, 100.0)
+    store.close()
+    assert store.last_error is not None
+    recover(path)
+    assert PortfolioStore(str(path)).load() == {}
+
+
+def test_failed_snapshot_keeps_the_journal(tmp_path):
+    path = tmp_path / "portfolio.db"
+    store = PortfolioStore(str(path), snapshot_every=1, batch_delay=0.01)
+    store.load()
+    fail_inserts(path, "snapshots")
+    store.start()
+    store.record_add("Default", "TCS", 5, 100.0)
+    wait_for(lambda: store.last_error is not None)
+    recover(path)
+    store.record_add("Default", "INFY", 2, 50.0)
+    store.close()
+    assert store.last_error is None
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshot_holdings").fetchone()[0] == 2
+    assert strip_dates(PortfolioStore(str(path)).load()) == {
+        "Default": {"TCS": (5, 500.0), "INFY": (2, 100.0)}}
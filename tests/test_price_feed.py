@@ -0,0 +1,26 @@
+import asyncio
+import json
+
+from price_feed import HttpPriceSource, usable_quotes
+
+
+def test_usable_quotes_drops_bad_prices():
+    quotes = json.loads('{"TCS": 3500.5, "INFY": "1500", "A": NaN, "B": Infinity, "C": 0, '
+                        '"D": -1, "E": null, "F": "N/A", "G": [1]}')
+    assert usable_quotes(quotes) == {"TCS": 3500.5, "INFY": 1500.0}
+
+
+def test_fetch_skips_bad_quotes_from_the_server():
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b'HTTP/1.0 200 OK\r\n\r\n{"TCS": 3500.0, "INFY": NaN, "ITC": -2}')
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await HttpPriceSource(f"http://127.0.0.1:{port}").fetch(["TCS", "INFY", "ITC"])
+
+    assert asyncio.run(run()) == {"TCS": 3500.0}
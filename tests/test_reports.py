@@ -0,0 +1,47 @@
+import csv
+import io
+
+from portfolio_core import Portfolio
+from reports import ReportData, render, write_report
+
+
+def book(size):
+    symbols = [f"S{i:05d}" for i in range(size)]
+    portfolio = Portfolio(dict.fromkeys(symbols, 10.0))
+    portfolio.add_many(symbols, [1] * size)
+    return portfolio, symbols
+
+
+def test_streamed_report_is_a_consistent_snapshot():
+    portfolio, symbols = book(10_000)
+    chunks = render(ReportData(portfolio), "csv")
+    text = [next(chunks)]
+    # The book keeps changing while the report streams
+    portfolio.update_prices(dict.fromkeys(symbols, 20.0))
+    portfolio.add("S00001", 100)
+    portfolio.clear()
+    text.extend(chunks)
+    rows = list(csv.reader(io.StringIO("".join(text))))
+    body, footer = rows[1:-1], rows[-1]
+    assert len(body) == 10_000
+    assert sum(float(row[3]) for row in body) == float(footer[3]) == 100_000
+
+
+def test_report_in_another_currency():
+    portfolio = Portfolio({"TCS": 830.0})
+    portfolio.add("TCS", 2)
+    output = io.StringIO()
+    write_report(render(ReportData(portfolio, currency="USD", rate=83.0), "csv"), output.write)
+    assert output.getvalue().splitlines() == [
+        "Stock,Quantity,Price (USD),Value (USD)",
+        "TCS,2,10.00,20.00",
+        "TOTAL,2,,20.00",
+    ]
+
+
+def test_txt_report_uses_indian_grouping():
+    portfolio = Portfolio({"TCS": 1234567.0})
+    portfolio.add("TCS", 1)
+    text = "".join(render(ReportData(portfolio), "txt"))
+    assert "₹12,34,567.00" in text
+    assert "₹12.35 Lakhs" in text
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from portfolio_core import Portfolio
+from risk import (DEFAULT_CORRELATION, DEFAULT_VOLATILITY, RiskJob, _cholesky,
+                  estimate_covariance, run_var)
+from timeseries import PriceHistory
+
+
+def make_history(series):
+    history = PriceHistory()
+    for symbol, closes in series.items():
+        for day, close in enumerate(closes):
+            history.append(symbol, day * 86400, close, close, close, close)
+    return history
+
+
+def random_walk(rng, bars, vol):
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, vol, bars)))
+
+
+def test_prior_without_history():
+    cov = estimate_covariance(None, ["A", "B"])
+    v = DEFAULT_VOLATILITY ** 2
+    assert np.allclose(cov, [[v, DEFAULT_CORRELATION * v], [DEFAULT_CORRELATION * v, v]])
+
+
+def test_short_history_uses_prior():
+    history = make_history({"A": [100.0 + i for i in range(5)]})
+    assert np.allclose(estimate_covariance(history, ["A", "B"]), estimate_covariance(None, ["A", "B"]))
+
+
+def test_prior_scales_with_sample_volatility():
+    rng = np.random.default_rng(1)
+    history = make_history({"A": random_walk(rng, 60, 0.05), "B": random_walk(rng, 60, 0.01)})
+    cov = estimate_covariance(history, ["A", "B", "C"])
+    sample = np.cov(np.diff(np.log(np.vstack([history.closes("A"), history.closes("B")])), axis=1))
+    assert np.allclose(cov[:2, :2], sample)
+    vols = np.sqrt(np.diag(sample))
+    assert np.allclose(cov[2, :2], DEFAULT_CORRELATION * vols * DEFAULT_VOLATILITY)
+    assert cov[2, 2] == pytest.approx(DEFAULT_VOLATILITY ** 2)
+    _cholesky(cov)
+
+
+def test_min_bars_boundary():
+    closes = [100.0 * 1.01 ** (i % 3) for i in range(21)]
+    history = make_history({"A": closes})
+    assert estimate_covariance(history, ["A"], min_bars=21)[0, 0] == pytest.approx(DEFAULT_VOLATILITY ** 2)
+    assert estimate_covariance(history, ["A"], min_bars=20)[0, 0] != pytest.approx(DEFAULT_VOLATILITY ** 2)
+
+
+def test_cholesky_accepts_flat_series_and_rejects_indefinite():
+    history = make_history({"A": [100.0] * 30, "B": [50.0] * 30})
+    _cholesky(estimate_covariance(history, ["A", "B", "C"]))
+    with pytest.raises(np.linalg.LinAlgError):
+        _cholesky(np.array([[1.0, 2.0], [2.0, 1.0]]))
+
+
+def test_run_var_is_reproducible_and_ordered():
+    cov = estimate_covariance(None, ["A", "B"])
+    first = run_var([1000.0, 2000.0], cov, scenarios=20_000, workers=1, seed=3)
+    second = run_var([1000.0, 2000.0], cov, scenarios=20_000, workers=1, seed=3)
+    assert first["levels"] == second["levels"]
+    var95, cvar95 = first["levels"][0.95]
+    var99, cvar99 = first["levels"][0.99]
+    assert 0 < var95 < var99 <= cvar99
+    assert var95 <= cvar95
+
+
+def test_risk_job_reports_failure():
+    portfolio = Portfolio({"A": 10.0, "B": 20.0})
+    portfolio.add_many(["A", "B"], [1, 1])
+    job = RiskJob(portfolio, scenarios=1000, workers=1)
+    job.cov = np.array([[1.0, 2.0], [2.0, 1.0]])
+    job._run()
+    kind, error = job.messages.get_nowait()
+    assert kind == "failed"
+    assert isinstance(error, np.linalg.LinAlgError)
+    assert job.total_value == 30.0
@@ -0,0 +1,61 @@
+import random
+import string
+
+import pytest
+
+import symbol_search
+from symbol_search import SymbolIndex, SymbolSearch, scan
+
+ENTRIES = {
+    "TCS": "Tata Consultancy Services",
+    "TATAMOTORS": "Tata Motors",
+    "TATASTEEL": "Tata Steel",
+    "INFY": "Infosys",
+    "M&M": "Mahindra & Mahindra",
+    "BAJAJ-AUTO": "Bajaj Auto",
+    "ITC": "ITC Ltd.",
+    "X": None,
+}
+
+
+def random_entries(count, seed=5):
+    rng = random.Random(seed)
+    entries = {}
+    while len(entries) < count:
+        symbol = "".join(rng.choices("ABCT", k=rng.randint(1, 8)))
+        words = ["".join(rng.choices("abct", k=rng.randint(2, 7))) for _ in range(rng.randint(1, 3))]
+        entries[symbol] = " ".join(words)
+    return entries
+
+
+def test_ranking():
+    index = SymbolIndex(ENTRIES)
+    assert index.search("tcs") == ["TCS"]
+    assert index.search("tata") == ["TATASTEEL", "TATAMOTORS", "TCS"]
+    assert index.search("steel") == ["TATASTEEL"]
+    assert index.search("osys") == ["INFY"]
+    assert index.search("auto") == ["BAJAJ-AUTO"]
+    assert index.search("  ") == index.symbols
+    assert index.search("zzz") == []
+
+
+@pytest.mark.parametrize("limit", [None, 1, 5, 50])
+def test_index_matches_scan(monkeypatch, limit):
+    monkeypatch.setattr(symbol_search, "RANGE_SORT", 4)
+    entries = random_entries(600)
+    index = SymbolIndex(entries)
+    rng = random.Random(limit)
+    queries = ["".join(rng.choices("abct", k=rng.randint(1, 6))) for _ in range(200)]
+    queries += list(string.ascii_lowercase[:4]) + ["abc def", "t"]
+    for query in queries:
+        assert index.search(query, limit) == scan(entries, query, limit), query
+
+
+def test_search_falls_back_to_scan_until_built():
+    search = SymbolSearch(ENTRIES)
+    search.start = lambda: None
+    assert search.search("tata", 2) == ["TATASTEEL", "TATAMOTORS"]
+    assert not search.ready
+    search._build()
+    assert search.ready
+    assert search.search("tata", 2) == ["TATASTEEL", "TATAMOTORS"]
@@ -0,0 +1,63 @@
+import pytest
+
+import tk_stub
+from tree_views import VirtualTreeView
+
+
+class Scrollbar(tk_stub.Widget):
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+@pytest.fixture
+def view():
+    keys = [f"K{i:04d}" for i in range(1000)]
+    tree = tk_stub.Treeview(height=10)
+    view = VirtualTreeView(tree, Scrollbar(), lambda: keys, lambda key: (key,))
+    view.flush()
+    view.backing = keys
+    return view
+
+
+def shown(view):
+    return [view.tree.rows[iid][0] for iid in view.slots]
+
+
+def test_only_the_window_exists_as_items(view):
+    assert len(view.tree.rows) == 10
+    assert shown(view) == [f"K{i:04d}" for i in range(10)]
+    assert view.scrollbar.position == (0, 0.01)
+
+
+@pytest.mark.parametrize("command, offset", [
+    (("moveto", "0.5"), 500),
+    (("moveto", "1.0"), 990),
+    (("moveto", "-0.2"), 0),
+    (("scroll", "3", "units"), 3),
+    (("scroll", "2", "pages"), 20),
+    (("scroll", "-1", "pages"), 0),
+])
+def test_scrollbar_commands_clamp_the_offset(view, command, offset):
+    view.yview(*command)
+    assert view.offset == offset
+    assert shown(view)[0] == f"K{offset:04d}"
+    assert view.scrollbar.position == (offset / 1000, (offset + 10) / 1000)
+
+
+def test_selection_follows_the_key(view):
+    view.tree.selection_set([view.slots[2]])
+    view._on_select(None)
+    assert view.selected == "K0002"
+    view.scroll(5)
+    assert view.tree.selection() == ()
+    view.scroll(-4)
+    assert view.tree.selection() == (view.slots[1],)
+
+
+def test_shrinking_data_trims_the_pool(view):
+    view.yview("moveto", "0.9")
+    del view.backing[5:]
+    view.flush()
+    assert view.offset == 0
+    assert shown(view) == [f"K{i:04d}" for i in range(5)]
+    assert len(view.tree.rows) == 5
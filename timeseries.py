@@ -0,0 +1,148 @@
+"""Per-symbol OHLC price history in compact NumPy arrays
+
+Each symbol keeps an int64 array of bar timestamps (POSIX seconds) and an
+(n, 4) float64 array of open/high/low/close. Histories can be saved to a
+directory of .npy files and loaded back memory-mapped, so a large archive
+costs nothing until a symbol is actually read.
+"""
+
+import os
+
+import numpy as np
+
+OPEN, HIGH, LOW, CLOSE = range(4)
+BAR_SECONDS = 86400
+
+
+class SymbolSeries:
+    """Growable bar arrays for one symbol"""
+
+    def __init__(self, times=None, ohlc=None, capacity=256):
+        if times is None:
+            times = np.zeros(capacity, dtype=np.int64)
+            ohlc = np.zeros((capacity, 4), dtype=np.float64)
+            self.size = 0
+        else:
+            self.size = len(times)
+        self._times = times
+        self._ohlc = ohlc
+
+    @property
+    def times(self):
+        return self._times[:self.size]
+
+    @property
+    def ohlc(self):
+        return self._ohlc[:self.size]
+
+    @property
+    def closes(self):
+        return self._ohlc[:self.size, CLOSE]
+
+    def _ensure_room(self):
+        # Memory-mapped arrays are read-only and exactly sized; copy on first write
+        capacity = len(self._times)
+        if self.size < capacity and self._times.flags.writeable:
+            return
+        capacity = max(256, capacity * 2)
+        times = np.zeros(capacity, dtype=np.int64)
+        ohlc = np.zeros((capacity, 4), dtype=np.float64)
+        times[:self.size] = self._times[:self.size]
+        ohlc[:self.size] = self._ohlc[:self.size]
+        self._times, self._ohlc = times, ohlc
+
+    def append(self, timestamp, open_, high, low, close):
+        self._ensure_room()
+        self._times[self.size] = timestamp
+        self._ohlc[self.size] = (open_, high, low, close)
+        self.size += 1
+
+    def record_tick(self, timestamp, price, bar_seconds=BAR_SECONDS):
+        """Fold a tick into the current bar; return True if it opened a new bar"""
+        bar_start = timestamp - timestamp % bar_seconds
+        if self.size and self._times[self.size - 1] == bar_start:
+            self._ensure_writable()
+            bar = self._ohlc[self.size - 1]
+            bar[HIGH] = max(bar[HIGH], price)
+            bar[LOW] = min(bar[LOW], price)
+            bar[CLOSE] = price
+            return False
+        self.append(bar_start, price, price, price, price)
+        return True
+
+    def _ensure_writable(self):
+        if not self._times.flags.writeable or not self._ohlc.flags.writeable:
+            self._times = np.array(self._times)
+            self._ohlc = np.array(self._ohlc)
+
+
+class PriceHistory:
+    """OHLC bars for many symbols"""
+
+    def __init__(self):
+        self.series = {}
+        self.changed = set()
+
+    def __contains__(self, symbol):
+        return symbol in self.series
+
+    def get(self, symbol):
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = SymbolSeries()
+        return series
+
+    def append(self, symbol, timestamp, open_, high, low, close):
+        self.get(symbol).append(timestamp, open_, high, low, close)
+        self.changed.add(symbol)
+
+    def record_ticks(self, prices, timestamp, bar_seconds=BAR_SECONDS):
+        """Fold a {symbol: price} tick into the current bars
+
+        Returns the symbols whose tick opened a new bar.
+        """
+        timestamp = int(timestamp)
+        self.changed.update(prices)
+        return [symbol for symbol, price in prices.items()
+                if self.get(symbol).record_tick(timestamp, price, bar_seconds)]
+
+    def closes(self, symbol):
+        series = self.series.get(symbol)
+        return series.closes if series else np.zeros(0)
+
+    def save(self, directory):
+        """Write changed symbols as <symbol>.times.npy and <symbol>.ohlc.npy
+
+        Files are replaced atomically, so arrays still memory-mapped from the
+        previous version stay valid.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for symbol in self.changed:
+            series = self.series.get(symbol)
+            if series is None or not series.size:
+                continue
+            for suffix, array in (("times", series.times), ("ohlc", series.ohlc)):
+                path = os.path.join(directory, f"{symbol}.{suffix}.npy")
+                with open(path + ".tmp", "wb") as file:
+                    np.save(file, array)
+                os.replace(path + ".tmp", path)
+        self.changed.clear()
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Load a saved history; arrays are memory-mapped unless mmap is False"""
+        history = cls()
+        if not os.path.isdir(directory):
+            return history
+        mode = "r" if mmap else None
+        for name in os.listdir(directory):
+            if not name.endswith(".times.npy"):
+                continue
+            symbol = name[:-len(".times.npy")]
+            ohlc_path = os.path.join(directory, f"{symbol}.ohlc.npy")
+            if not os.path.exists(ohlc_path):
+                continue
+            times = np.load(os.path.join(directory, name), mmap_mode=mode)
+            ohlc = np.load(ohlc_path, mmap_mode=mode)
+            history.series[symbol] = SymbolSeries(times, ohlc)
+        return history
@@ -0,0 +1,234 @@
+"""Minimal stand-in for the tkinter widgets the app uses, for headless runs
+
+install() registers stub tkinter, ttk, messagebox, scrolledtext, filedialog
+and simpledialog modules so Stock-Portfolio.py can be loaded and driven
+without a display. Widgets accept any options and ignore layout calls;
+the pieces the app's logic depends on (variables, Treeview items, text
+length, after/after_idle callbacks) behave like the real thing. Callbacks
+queue on one EventLoop and run when run_pending() is called.
+"""
+
+import itertools
+import sys
+import types
+
+
+class EventLoop:
+    """after/after_idle callbacks, run in order by run_pending()"""
+
+    def __init__(self):
+        self.queue = {}
+        self._ids = itertools.count(1)
+
+    def schedule(self, callback, args):
+        after_id = f"after#{next(self._ids)}"
+        self.queue[after_id] = (callback, args)
+        return after_id
+
+    def cancel(self, after_id):
+        self.queue.pop(after_id, None)
+
+    def run_pending(self, limit=1_000_000):
+        """Run queued callbacks (and the ones they queue); return how many ran"""
+        ran = 0
+        while self.queue and ran < limit:
+            after_id = next(iter(self.queue))
+            callback, args = self.queue.pop(after_id)
+            callback(*args)
+            ran += 1
+        return ran
+
+
+LOOP = EventLoop()
+
+
+class Variable:
+    def __init__(self, master=None, value="", name=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+class StringVar(Variable):
+    pass
+
+
+class Widget:
+    """Accepts any constructor options and method calls"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = dict(options)
+        self.destroyed = False
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: None
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def __getitem__(self, key):
+        return self.options.get(key)
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, key):
+        return self.options.get(key, "")
+
+    def after(self, ms, callback=None, *args):
+        return LOOP.schedule(callback, args)
+
+    def after_idle(self, callback, *args):
+        return LOOP.schedule(callback, args)
+
+    def after_cancel(self, after_id):
+        LOOP.cancel(after_id)
+
+    def winfo_exists(self):
+        return not self.destroyed
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class Tk(Widget):
+    def mainloop(self):
+        LOOP.run_pending()
+
+    def update(self):
+        LOOP.run_pending()
+
+
+class Toplevel(Widget):
+    pass
+
+
+class Combobox(Widget):
+    def set(self, value):
+        variable = self.options.get("textvariable")
+        if variable is not None:
+            variable.set(value)
+
+    def get(self):
+        variable = self.options.get("textvariable")
+        return variable.get() if variable is not None else ""
+
+
+class Treeview(Widget):
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.rows = {}
+        self._selection = ()
+        self._ids = itertools.count(1)
+
+    def cget(self, key):
+        if key == "height":
+            return self.options.get("height", 10)
+        return super().cget(key)
+
+    def insert(self, parent, index, iid=None, **options):
+        iid = iid or f"I{next(self._ids):06X}"
+        self.rows[iid] = options.get("values", ())
+        return iid
+
+    def item(self, iid, **options):
+        if "values" in options:
+            self.rows[iid] = options["values"]
+        return {"values": self.rows.get(iid, ())}
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.rows.pop(iid, None)
+
+    def get_children(self, item=""):
+        return tuple(self.rows)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, items):
+        self._selection = tuple(items)
+
+    def bbox(self, item, column=None):
+        return (0, 0, 200, 20) if item in self.rows else ""
+
+
+class Text(Widget):
+    """Keeps only the length of the inserted text"""
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.length = 0
+
+    def insert(self, index, chars, *args):
+        self.length += len(chars)
+
+    def delete(self, first, last=None):
+        self.length = 0
+
+
+Frame = Label = LabelFrame = Button = Entry = Scrollbar = Progressbar = Widget
+ScrolledText = Text
+
+RAISED, SUNKEN, GROOVE, FLAT, RIDGE, SOLID = "raised", "sunken", "groove", "flat", "ridge", "solid"
+WORD, CHAR, NONE = "word", "char", "none"
+END = "end"
+
+
+class Dialogs:
+    """Canned answers for messagebox / filedialog / simpledialog calls"""
+
+    def __init__(self):
+        self.answers = {"askyesno": True, "askopenfilename": "", "asksaveasfilename": "",
+                        "askstring": None}
+        self.shown = []
+
+    def handler(self, name):
+        def show(*args, **kwargs):
+            self.shown.append((name, args))
+            return self.answers.get(name)
+        return show
+
+
+DIALOGS = Dialogs()
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install():
+    """Register the stub modules in sys.modules (before the app is imported)"""
+    names = ("showinfo", "showwarning", "showerror", "askyesno")
+    modules = {
+        "tkinter.ttk": _module("tkinter.ttk", Treeview=Treeview, Scrollbar=Scrollbar,
+                               Combobox=Combobox, Progressbar=Progressbar, Frame=Frame,
+                               Label=Label, Button=Button, Entry=Entry),
+        "tkinter.messagebox": _module("tkinter.messagebox",
+                                      **{n: DIALOGS.handler(n) for n in names}),
+        "tkinter.scrolledtext": _module("tkinter.scrolledtext", ScrolledText=ScrolledText),
+        "tkinter.filedialog": _module("tkinter.filedialog",
+                                      askopenfilename=DIALOGS.handler("askopenfilename"),
+                                      asksaveasfilename=DIALOGS.handler("asksaveasfilename")),
+        "tkinter.simpledialog": _module("tkinter.simpledialog",
+                                        askstring=DIALOGS.handler("askstring")),
+    }
+    tkinter = _module("tkinter", Tk=Tk, Toplevel=Toplevel, Frame=Frame, Label=Label,
+                      LabelFrame=LabelFrame, Button=Button, Entry=Entry, Text=Text,
+                      StringVar=StringVar, Variable=Variable, **{
+                          k: v for k, v in globals().items() if k.isupper() and isinstance(v, str)})
+    for name, module in modules.items():
+        setattr(tkinter, name.split(".")[1], module)
+    sys.modules["tkinter"] = tkinter
+    sys.modules.update(modules)
@@ -0,0 +1,166 @@
+"""Treeview helpers that keep redraw cost proportional to what changed"""
+
+from perf import timed
+
+
+class CoalescedTreeView:
+    """Keeps a Treeview in sync with keyed rows, one redraw per frame
+
+    row_values(key) returns the tuple to display for key, or None when the
+    row should be removed. mark_dirty() only records keys; the first call
+    in a frame schedules a single after_idle flush that touches just the
+    dirty rows through a key->iid map, so no Treeview scans are needed.
+    """
+
+    def __init__(self, tree, row_values):
+        self.tree = tree
+        self.row_values = row_values
+        self.items = {}
+        self.dirty = {}
+        self._pending = None
+
+    def mark_dirty(self, keys):
+        self.dirty.update(dict.fromkeys(keys))
+        if self.dirty and self._pending is None:
+            self._pending = self.tree.after_idle(self.flush)
+
+    def reset(self):
+        """Drop every row immediately"""
+        if self._pending is not None:
+            self.tree.after_cancel(self._pending)
+            self._pending = None
+        self.dirty.clear()
+        self.items.clear()
+        self.tree.delete(*self.tree.get_children())
+
+    @timed("redraw")
+    def flush(self):
+        """Apply all pending row changes"""
+        self._pending = None
+        dirty, self.dirty = self.dirty, {}
+        for key in dirty:
+            values = self.row_values(key)
+            iid = self.items.get(key)
+            if values is None:
+                if iid is not None:
+                    self.tree.delete(iid)
+                    del self.items[key]
+            elif iid is None:
+                self.items[key] = self.tree.insert("", "end", values=values)
+            else:
+                self.tree.item(iid, values=values)
+
+
+class VirtualTreeView:
+    """Windowed Treeview: only the visible rows exist as Tk items
+
+    keys() returns the ordered backing keys and row_values(key) the tuple
+    to show for one of them. The Treeview holds a small pool of items that
+    is refilled from the backing data at the current scroll offset, and the
+    scrollbar is driven from the logical row count, so startup and scroll
+    cost depend on the window height rather than on the number of rows.
+    """
+
+    def __init__(self, tree, scrollbar, keys, row_values):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.keys = keys
+        self.row_values = row_values
+        self.height = int(tree.cget("height"))
+        self.offset = 0
+        self.slots = []
+        self.shown = []
+        self.selected = None
+        self._pending = None
+
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand="")
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll(3))
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+
+    def mark_dirty(self, keys=()):
+        if self._pending is None:
+            self._pending = self.tree.after_idle(self.flush)
+
+    def reset(self):
+        self.offset = 0
+        self.selected = None
+        self.mark_dirty()
+
+    def scroll(self, rows):
+        self._move_to(self.offset + rows)
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, what)"""
+        count = len(self.keys())
+        if args[0] == "moveto":
+            self._move_to(round(float(args[1]) * count))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.height if args[2] == "pages" else 1)
+            self.scroll(step)
+
+    def _move_to(self, offset):
+        offset = max(0, min(offset, len(self.keys()) - self.height))
+        if offset != self.offset:
+            self.offset = offset
+            self.flush()
+
+    @timed("redraw")
+    def flush(self):
+        """Refill the visible window from the backing data"""
+        if self._pending is not None:
+            self.tree.after_cancel(self._pending)
+            self._pending = None
+        keys = self.keys()
+        count = len(keys)
+        self.offset = max(0, min(self.offset, count - self.height))
+        window = keys[self.offset:self.offset + self.height]
+
+        while len(self.slots) < len(window):
+            self.slots.append(self.tree.insert("", "end"))
+            self.shown.append(None)
+        if len(self.slots) > len(window):
+            self.tree.delete(*self.slots[len(window):])
+            del self.slots[len(window):], self.shown[len(window):]
+
+        selection = ()
+        for i, key in enumerate(window):
+            values = self.row_values(key)
+            if values != self.shown[i]:
+                self.tree.item(self.slots[i], values=values)
+                self.shown[i] = values
+            if key == self.selected:
+                selection = (self.slots[i],)
+        if tuple(self.tree.selection()) != selection:
+            self.tree.selection_set(selection)
+
+        if count:
+            self.scrollbar.set(self.offset / count, (self.offset + len(window)) / count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.slots:
+            keys = self.keys()
+            position = self.offset + self.slots.index(selection[0])
+            self.selected = keys[position] if position < len(keys) else None
+
+    def _on_configure(self, event):
+        # Size the pool to the rows that actually fit once a row has been laid out
+        if not self.slots:
+            return
+        bbox = self.tree.bbox(self.slots[0])
+        if bbox:
+            _, top, _, row_height = bbox
+            height = max(1, (event.height - top) // row_height)
+            if height != self.height:
+                self.height = height
+                self.mark_dirty()